@@ -0,0 +1,102 @@
+"""
+cost of repeat construction of interned objects in hot loops
+
+usage: python -m musictool.benchmark [n_calls]
+
+for each class:
+- hit: constructor call for already interned arguments (key + cache lookup only)
+- init: running __init__ on interned instance, what every cache hit used to cost on top of lookup
+- build: construction of new instance, bypassing the cache
+
+also measures real clock timing accuracy of midi Player against fake port
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from musictool.chord import SpecificChord
+from musictool.midi.player import Player
+from musictool.midi.player import rhythm_events
+from musictool.note import Note
+from musictool.note import SpecificNote
+from musictool.noteset import NoteSet
+from musictool.progression import Progression
+from musictool.rhythm import Rhythm
+from musictool.scale import Scale
+from musictool.util.cache import Cached
+
+
+def _cases() -> list[tuple[type[Cached], tuple[Any, ...], dict[str, Any]]]:
+    notes = frozenset(map(Note, 'CdeFGab'))
+    chords = tuple(SpecificChord.from_str(s) for s in ('C1_E1_G1', 'A0_C1_E1', 'F0_A0_C1', 'G0_B0_D1'))
+    return [
+        (Note, ('C',), {}),
+        (SpecificNote, (Note('C'), 4), {}),
+        (NoteSet, (notes,), {}),
+        (Scale, (notes,), {'root': Note('C')}),
+        (SpecificChord, (chords[0].notes,), {'root': Note('C')}),
+        (Progression, (chords,), {}),
+    ]
+
+
+def _per_call(f: Callable[[], object], n: int) -> float:
+    """best of 5 runs, nanoseconds per call"""
+    return min(timeit.repeat(f, number=n, repeat=5)) / n * 1e9
+
+
+def run(n: int = 10_000) -> list[tuple[str, float, float, float]]:
+    """rows of (class name, hit ns, init ns, build ns)"""
+    rows = []
+    for cls, args, kwargs in _cases():
+        instance = cls(*args, **kwargs)
+
+        def build() -> None:
+            new = object.__new__(cls)
+            new.__init__(*args, **kwargs)  # type: ignore[misc]
+
+        hit = _per_call(lambda: cls(*args, **kwargs), n)
+        init = _per_call(lambda: instance.__init__(*args, **kwargs), n)  # type: ignore[misc]
+        rows.append((cls.__name__, hit, init, _per_call(build, n)))
+    return rows
+
+
+class _RecordingPort:
+    """fake midi port, records clock time of every send"""
+
+    def __init__(self) -> None:
+        self.times: list[float] = []
+
+    def send(self, message: object) -> None:
+        self.times.append(time.perf_counter())
+
+
+def player_timing(n_bars: int = 8) -> tuple[float, float]:
+    """median and max error in seconds of send times of long lazy sequence of 16th notes of 12.5ms"""
+    port = _RecordingPort()
+    player = Player(port=port)
+    rhythm = Rhythm((1, 0, 1, 1) * 4, beats_per_minute=1200)
+    events = list(rhythm_events(rhythm, [SpecificChord.from_str('C1_E1_G1')] * n_bars))
+    asyncio.run(player.play_events(iter(events), lookahead=0.05))
+    start = port.times[0]
+    errors = [abs((t - start) - e.seconds) for t, e in zip(port.times, sorted(events, key=lambda e: e.sort_key))]
+    return statistics.median(errors), max(errors)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{'class':<15}{'hit, ns':>12}{'init, ns':>12}{'build, ns':>12}")
+    for name, hit, init, build in run(n):
+        print(f'{name:<15}{hit:>12.0f}{init:>12.0f}{build:>12.0f}')
+    median, max_ = player_timing()
+    print(f'\nPlayer timing error: median {median * 1e3:.3f} ms, max {max_ * 1e3:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
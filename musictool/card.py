@@ -1,7 +1,27 @@
+from __future__ import annotations
+
 import abc
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+if TYPE_CHECKING:
+    from musictool.piano import Piano
+
+
+class CardData(NamedTuple):
+    """everything card shows, rendered by Card._repr_html_ or in batch by musictool.gallery"""
+    html_classes: tuple[str, ...] = ()
+    title: str | None = None
+    subtitle: str | None = None
+    header_href: str | None = None
+    background_color: str | None = None
+    piano: Piano | None = None
 
 
 class Card(abc.ABC):
+    __slots__ = ()
+
     @staticmethod
     def repr_card(
         html_classes: tuple[str, ...] = (),
@@ -63,12 +83,45 @@ class Card(abc.ABC):
         return out
 
     @abc.abstractmethod
-    def _repr_html_(
+    def to_piano(self) -> Piano:
+        ...
+
+    def to_piano_image(self) -> str:
+        return self.to_piano()._repr_svg_(pretty=False)
+
+    @abc.abstractmethod
+    def card_data(
         self,
         html_classes: tuple[str, ...] = (),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
+    ) -> CardData:
         ...
+
+    def _repr_html_(
+        self,
+        html_classes: tuple[str, ...] | None = None,
+        title: str | None = None,
+        subtitle: str | None = None,
+        header_href: str | None = None,
+        background_color: str | None = None,
+    ) -> str:
+        """only arguments which are not None are passed to card_data, so defaults of subclasses are used for the rest"""
+        kwargs: dict[str, Any] = {
+            'html_classes': html_classes,
+            'title': title,
+            'subtitle': subtitle,
+            'header_href': header_href,
+            'background_color': background_color,
+        }
+        html_classes, title, subtitle, header_href, background_color, piano = self.card_data(**{k: v for k, v in kwargs.items() if v is not None})
+        return self.repr_card(
+            html_classes=html_classes,
+            title=title,
+            subtitle=subtitle,
+            header_href=header_href,
+            background_color=background_color,
+            piano_html=None if piano is None else piano._repr_svg_(pretty=False),
+        )
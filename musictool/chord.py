@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-import functools
 import itertools
 import random
+from collections.abc import Iterable
 from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
 from musictool import config
 from musictool.card import Card
+from musictool.card import CardData
 from musictool.note import Note
 from musictool.note import SpecificNote
 from musictool.noteset import NoteSet
 from musictool.util.cache import Cached
+from musictool.util.cache import WeakValueCache
+
+if TYPE_CHECKING:
+    from musictool.piano import Piano
 
 
 class Chord(NoteSet):
@@ -42,49 +48,99 @@ class Chord(NoteSet):
             raise TypeError('Chord requires root note. Use NoteSet if there is no root')
         super().__init__(notes, root=root)
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = ('card',),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
-        return self.repr_card(
+    ) -> CardData:
+        return CardData(
             html_classes=html_classes,
             title=title or f'{self.root.name} {self.name}',
             subtitle=subtitle,
             header_href=header_href,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
 
 
 class SpecificChord(Cached, Card):
-    def __init__(
-        self,
+    """
+    stored as sorted tuple of MIDI codes
+    notes, notes_ascending, intervals, abstract etc. are derived from codes on access
+    """
+    __slots__ = ('codes', 'root', 'key', '_abstract', '_transposed_to_C0', '__weakref__')
+    _cache_factory = WeakValueCache
+
+    codes: tuple[int, ...]
+    root: Note | None
+    key: tuple[tuple[int, ...], Note | None]
+    _abstract: NoteSet
+    _transposed_to_C0: SpecificChord
+
+    @classmethod
+    def _cache_key(  # type: ignore[override]
+        cls,
         notes: frozenset[SpecificNote],
         *,
         root: str | Note | None = None,
-    ):
+    ) -> tuple[tuple[int, ...], Note | None]:
         if not isinstance(notes, frozenset):
             raise TypeError(f'expected frozenset, got {type(notes)}')
+        if isinstance(root, str):
+            root = Note(root)
+        return tuple(sorted(note.i for note in notes)), root
 
+    def __init__(
+        self,
+        notes: frozenset[SpecificNote],
+        *,
+        root: str | Note | None = None,
+    ):
         if isinstance(root, str):
             root = Note(root)
 
-        notes_abstract = SpecificNote.to_abstract(notes)
-        if root is not None and root not in notes_abstract:
+        codes = tuple(sorted(note.i for note in notes))
+        if root is not None and all(code % 12 != root.i for code in codes):
             raise KeyError('root should be one of notes')
 
-        self.notes = notes
+        self.codes = codes
         self.root = root
-        self.abstract = Chord(notes_abstract, root=root) if root is not None else NoteSet(notes_abstract)
-        self.root_specific = frozenset(note for note in notes if note.abstract == root) if root is not None else frozenset()
+        self.key = codes, root
 
-        self.notes_ascending = tuple(sorted(notes))
-        self.intervals = tuple(note - self.notes_ascending[0] for note in self.notes_ascending)  # from lowest note
-        self.key = self.notes, self.root
+    @classmethod
+    def from_codes(cls, codes: Iterable[int], root: str | Note | None = None) -> SpecificChord:
+        return cls(frozenset(SpecificNote.from_i(code) for code in codes), root=root)
+
+    @property
+    def notes(self) -> frozenset[SpecificNote]:
+        return frozenset(self.notes_ascending)
+
+    @property
+    def notes_ascending(self) -> tuple[SpecificNote, ...]:
+        return tuple(SpecificNote.from_i(code) for code in self.codes)
+
+    @property
+    def intervals(self) -> tuple[int, ...]:
+        """from lowest note"""
+        return tuple(code - self.codes[0] for code in self.codes)
+
+    @property
+    def abstract(self) -> NoteSet:
+        try:
+            return self._abstract
+        except AttributeError:
+            notes_abstract = frozenset(Note.from_i(code) for code in self.codes)
+            self._abstract = Chord(notes_abstract, root=self.root) if self.root is not None else NoteSet(notes_abstract)
+            return self._abstract
+
+    @property
+    def root_specific(self) -> frozenset[SpecificNote]:
+        if self.root is None:
+            return frozenset()
+        return frozenset(SpecificNote.from_i(code) for code in self.codes if code % 12 == self.root.i)
 
     @classmethod
     def random(cls, n_notes: int | None = None, octaves: tuple[int, ...] = (3, 4, 5)) -> SpecificChord:
@@ -114,13 +170,13 @@ class SpecificChord(Cached, Card):
         return tuple((n, m) for n, m in self.notes_combinations() if abs(m - n) == interval)
 
     def __len__(self) -> int:
-        return len(self.notes)
+        return len(self.codes)
 
     def __getitem__(self, item: int) -> SpecificNote:
-        return self.notes_ascending[item]
+        return SpecificNote.from_i(self.codes[item])
 
     def __iter__(self) -> Iterator[SpecificNote]:
-        return iter(self.notes_ascending)
+        return map(SpecificNote.from_i, self.codes)
 
     def __repr__(self) -> str:
         x = '_'.join(repr(note) for note in self.notes_ascending)
@@ -144,13 +200,17 @@ class SpecificChord(Cached, Card):
         if not isinstance(other, int):
             raise TypeError('only adding integers is allowed (transposition)')
         root = self.root + other if self.root is not None else None
-        return SpecificChord(frozenset(note + other for note in self), root=root)
+        return SpecificChord.from_codes((code + other for code in self.codes), root=root)
 
-    @functools.cached_property
+    @property
     def transposed_to_C0(self) -> SpecificChord:
-        return self + (SpecificNote('C', 0) - self[0])
+        try:
+            return self._transposed_to_C0
+        except AttributeError:
+            self._transposed_to_C0 = self + -self.codes[0]
+            return self._transposed_to_C0
 
-    def to_piano_image(self) -> str:
+    def to_piano(self) -> Piano:
         from musictool.noterange import NoteRange
         from musictool.piano import Piano
         noterange = NoteRange(self[0], self[-1]) if self.notes else None
@@ -158,23 +218,23 @@ class SpecificChord(Cached, Card):
             note_colors=dict.fromkeys(self.notes, config.RED),
             squares={note: {'text': str(note), 'text_size': '8'} for note in self},
             noterange=noterange,
-        )._repr_svg_()
+        )
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = ('card',),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
-        return self.repr_card(
+    ) -> CardData:
+        return CardData(
             html_classes=html_classes,
             title=title or repr(self),
             subtitle=subtitle,
             header_href=header_href,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
 
     def __getnewargs_ex__(self) -> tuple[tuple[frozenset[SpecificNote]], dict[str, Note | None]]:
@@ -0,0 +1,79 @@
+"""
+batch rendering of many cards into one html document
+
+compared to concatenating Card._repr_html_ outputs:
+- card styles are shared css classes instead of inline styles repeated in every card
+- keys of each piano layout are defined once in <defs> and referenced by <use>,
+  each card draws only keys which differ from default
+- document is produced lazily chunk by chunk, so it can be streamed to file
+"""
+
+from __future__ import annotations
+
+import contextlib
+from collections.abc import Iterable
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+from musictool.card import Card
+from musictool.card import CardData
+from musictool.piano import LayoutArgs
+from musictool.piano import template_defs
+
+CSS = '''\
+.card{margin:5px;width:fit-content;padding:0px 2px 0px 2px;border:1px solid rgba(0,0,0,0.5);height:120px;box-shadow:2px 2px;border-radius:3px;display:inline-block;vertical-align:top}
+.card_header{height:32px;font-family:sans-serif}
+.card_title{font-size:1em;font-weight:bold}
+.card_subtitle{margin-top:-0.2em;font-size:0.8em}
+.piano_templates{position:absolute;width:0;height:0}
+'''
+
+
+def card_html(data: CardData, piano_svg: str | None = None) -> str:
+    """same structure as Card.repr_card, styles are in CSS"""
+    html_classes, title, subtitle, header_href, background_color, _ = data
+    header = ''
+    if title is not None:
+        header += f"<div class='card_title'>{title}</div>"
+    if subtitle is not None:
+        header += f"<div class='card_subtitle'>{subtitle}</div>"
+    header = f"<div class='card_header'>{header}</div>"
+    if header_href is not None:
+        header = f"<a href='{header_href}'>{header}</a>"
+    style = f" style='background-color: {background_color};'" if background_color is not None else ''
+    classes = ' '.join(('card', *html_classes))
+    return f"<div class='{classes}'{style}>{header}{piano_svg or ''}</div>\n"
+
+
+def iter_html(cards: Iterable[Card | CardData], title: str = 'musictool') -> Iterator[str]:
+    """
+    cards are Card objects (rendered with default card_data()) or CardData (e.g. card.card_data(title=...))
+    piano templates are emitted right before first card which uses them
+    """
+    yield f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='utf-8'>\n<title>{title}</title>\n<style>\n{CSS}</style>\n</head>\n<body>\n"
+    templates: dict[LayoutArgs, str] = {}
+    for card in cards:
+        data = card.card_data() if isinstance(card, Card) else card
+        piano_svg = None
+        if data.piano is not None:
+            layout_args = data.piano.layout_args
+            template_id = templates.get(layout_args)
+            if template_id is None:
+                template_id = templates[layout_args] = f'piano{len(templates)}'
+                yield f"<svg class='piano_templates'><defs>{template_defs(layout_args, template_id)}</defs></svg>\n"
+            piano_svg = data.piano.svg_use(template_id)
+        yield card_html(data, piano_svg)
+    yield '</body>\n</html>\n'
+
+
+def render_cards(cards: Iterable[Card | CardData], title: str = 'musictool') -> str:
+    """html document"""
+    return ''.join(iter_html(cards, title))
+
+
+def write_cards(cards: Iterable[Card | CardData], file: str | Path | TextIO, title: str = 'musictool') -> None:
+    """writes html document to file (path or text file object) without keeping it in memory"""
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(open(file, 'w')) if isinstance(file, str | Path) else file
+        f.writelines(iter_html(cards, title))
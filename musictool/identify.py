@@ -0,0 +1,92 @@
+"""
+chord and scale identification from arbitrary collections of notes
+
+every interpretation (root, name) of every chord and scale is precomputed for all 4096 pitch-class masks,
+so identification is single table lookup and does not try roots one by one
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from musictool import config
+from musictool.chord import Chord
+from musictool.note import Note
+from musictool.note import SpecificNote
+from musictool.noteset import CHROMATIC_MASK
+from musictool.noteset import NoteSet
+from musictool.noteset import mask_to_notes
+from musictool.noteset import notes_to_mask
+from musictool.noteset import rotate_mask
+from musictool.scale import Scale
+
+CHORD = 'chord'
+
+
+class Interpretation(NamedTuple):
+    root: Note
+    name: str
+    kind: str  # 'chord' or kind of scale (diatonic, pentatonic, ...)
+    missing: frozenset[Note]  # notes of chord/scale which are not in identified notes
+
+    def to_noteset(self) -> NoteSet:
+        cls = Chord if self.kind == CHORD else Scale
+        return cls.from_name(self.root, self.name)
+
+
+def notes_mask(notes: Iterable[Note | SpecificNote | int]) -> int:
+    """pitch-class mask, ints are MIDI codes"""
+    return notes_to_mask(
+        note if isinstance(note, Note) else note.abstract if isinstance(note, SpecificNote) else Note.from_i(note)
+        for note in notes
+    )
+
+
+def submasks(mask: int) -> Iterator[int]:
+    """all non-empty submasks of mask"""
+    sub = mask
+    while sub:
+        yield sub
+        sub = (sub - 1) & mask
+
+
+def _sort_key(interpretation: Interpretation) -> tuple[int, bool, int, str]:
+    return len(interpretation.missing), interpretation.kind != CHORD, interpretation.root.i, interpretation.name
+
+
+@functools.cache
+def _tables() -> tuple[tuple[tuple[Interpretation, ...], ...], tuple[tuple[Interpretation, ...], ...]]:
+    """
+    table[mask] is every chord and scale which contains all notes of mask
+    exact[mask] is every chord and scale which consists exactly of notes of mask
+    """
+    families = [(intervals_mask, name, CHORD) for intervals_mask, name in Chord._mask_to_name.items()]
+    families += [(intervals_mask, name, config.kinds[name]) for intervals_mask, name in Scale._mask_to_name.items()]
+    table: list[list[Interpretation]] = [[] for _ in range(CHROMATIC_MASK + 1)]
+    for intervals_mask, name, kind in families:
+        for root in range(12):
+            full = rotate_mask(intervals_mask, root)
+            for sub in submasks(full):
+                table[sub].append(Interpretation(Note.from_i(root), name, kind, mask_to_notes(full & ~sub)))
+    sorted_table = tuple(tuple(sorted(interpretations, key=_sort_key)) for interpretations in table)
+    exact = tuple(tuple(i for i in interpretations if not i.missing) for interpretations in sorted_table)
+    return sorted_table, exact
+
+
+def identify(notes: Iterable[Note | SpecificNote | int]) -> tuple[Interpretation, ...]:
+    """chords and scales which consist exactly of given notes (octaves and duplicates are ignored)"""
+    return _tables()[1][notes_mask(notes)]
+
+
+def interpretations(notes: Iterable[Note | SpecificNote | int], max_missing: int | None = None) -> tuple[Interpretation, ...]:
+    """
+    chords and scales which contain all given notes, sorted by number of missing notes (exact matches first),
+    chords before scales
+    """
+    out = _tables()[0][notes_mask(notes)]
+    if max_missing is None:
+        return out
+    return tuple(i for i in out if len(i.missing) <= max_missing)
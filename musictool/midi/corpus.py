@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import tqdm
+
+from musictool.midi.parse import NoteColumns
+from musictool.midi.parse import iter_note_columns
+
+COLUMNS = {
+    'pitch': np.int16,
+    'on': np.int64,
+    'off': np.int64,
+    'track': np.int16,
+    'file_id': np.int32,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class NoteTable:
+    """notes of whole corpus, one array per column, file_id indexes files"""
+    pitch: npt.NDArray[np.int16]
+    on: npt.NDArray[np.int64]
+    off: npt.NDArray[np.int64]
+    track: npt.NDArray[np.int16]
+    file_id: npt.NDArray[np.int32]
+    files: tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.pitch)
+
+    def file_notes(self, file_id: int) -> NoteColumns:
+        """notes of single file, file_id column is sorted so this is a binary search"""
+        start, stop = np.searchsorted(self.file_id, (file_id, file_id + 1))
+        return NoteColumns(pitch=self.pitch[start:stop], on=self.on[start:stop], off=self.off[start:stop], track=self.track[start:stop])
+
+
+def _parse_file(path: Path) -> NoteColumns | str:
+    """runs in worker process, returns error message if file can't be parsed"""
+    try:
+        batches = list(iter_note_columns(path))
+    except (ValueError, EOFError, OSError) as e:
+        return f'{type(e).__name__}: {e}'
+    if not batches:
+        empty = np.empty(0, dtype=np.int64)
+        return NoteColumns(pitch=empty.astype(np.int16), on=empty, off=empty, track=empty.astype(np.int16))
+    return NoteColumns(*(np.concatenate(column) for column in zip(*batches, strict=True)))
+
+
+def ingest_corpus(
+    directory: str | Path,
+    output: str | Path,
+    max_workers: int | None = None,
+    pattern: str = '**/*.mid',
+) -> NoteTable:
+    """
+    parses all MIDI files matching pattern in directory across process pool
+    notes are appended to output directory as one raw binary file per column as soon as each file is parsed
+    file_id is position of file in sorted list of paths
+    """
+    directory = Path(directory)
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = sorted(directory.glob(pattern))
+    files: list[str] = []
+    errors: dict[str, str] = {}
+    n_notes = 0
+    handles = {name: open(output / f'{name}.bin', 'wb') for name in COLUMNS}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for path, columns in tqdm.tqdm(zip(paths, executor.map(_parse_file, paths, chunksize=4)), total=len(paths)):
+                relpath = str(path.relative_to(directory))
+                if isinstance(columns, str):
+                    errors[relpath] = columns
+                    continue
+                file_id = np.full(len(columns.pitch), len(files), dtype=COLUMNS['file_id'])
+                for name, column in (*columns._asdict().items(), ('file_id', file_id)):
+                    handles[name].write(np.ascontiguousarray(column, dtype=COLUMNS[name]).tobytes())
+                files.append(relpath)
+                n_notes += len(file_id)
+    finally:
+        for f in handles.values():
+            f.close()
+    meta = {'n_notes': n_notes, 'files': files, 'errors': errors, 'columns': {k: np.dtype(v).str for k, v in COLUMNS.items()}}
+    (output / 'meta.json').write_text(json.dumps(meta, indent=2))
+    return load_corpus(output)
+
+
+def load_corpus(path: str | Path) -> NoteTable:
+    """memory-maps columns written by ingest_corpus"""
+    path = Path(path)
+    meta = json.loads((path / 'meta.json').read_text())
+    n = meta['n_notes']
+
+    def column(name: str) -> npt.NDArray[np.generic]:
+        dtype = np.dtype(meta['columns'][name])
+        if n == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path / f'{name}.bin', dtype=dtype, mode='r', shape=(n,))
+
+    return NoteTable(**{name: column(name) for name in COLUMNS}, files=tuple(meta['files']))  # type: ignore[arg-type]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='parse directory of MIDI files into columnar note table')
+    parser.add_argument('directory')
+    parser.add_argument('output')
+    parser.add_argument('--max-workers', type=int)
+    args = parser.parse_args()
+    table = ingest_corpus(args.directory, args.output, max_workers=args.max_workers)
+    print(f'{len(table)} notes from {len(table.files)} files')
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import bisect
+import statistics
+from collections.abc import Iterable
+
+from musictool.midi.parse import MidiNote
+
+
+class _Node:
+    """all notes of node sound at center: on <= center < off"""
+    __slots__ = ('center', 'by_on', 'by_off', 'left', 'right')
+
+    def __init__(self, notes: list[MidiNote]):
+        self.center = statistics.median_low(note.on for note in notes)
+        here = [note for note in notes if note.on <= self.center < note.off]
+        left = [note for note in notes if note.off <= self.center]
+        right = [note for note in notes if note.on > self.center]
+        self.by_on = sorted(here, key=lambda note: note.on)
+        self.by_off = sorted(here, key=lambda note: note.off, reverse=True)
+        self.left = _Node(left) if left else None
+        self.right = _Node(right) if right else None
+
+
+class NoteIndex:
+    """
+    static centered interval tree over notes, note sounds in half-open interval [on, off)
+    queries take O(log n + k) where k is number of returned notes
+    zero-length notes never sound and are only returned by starting()
+    """
+
+    def __init__(self, notes: Iterable[MidiNote]):
+        self.notes = sorted(notes, key=lambda note: note.on)
+        self._ons = [note.on for note in self.notes]
+        sounding = [note for note in self.notes if note.on < note.off]
+        self._root = _Node(sounding) if sounding else None
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def at(self, t: int) -> list[MidiNote]:
+        """notes which sound at tick t"""
+        out = []
+        node = self._root
+        while node is not None:
+            if t < node.center:
+                for note in node.by_on:
+                    if note.on > t:
+                        break
+                    out.append(note)
+                node = node.left
+            else:
+                for note in node.by_off:
+                    if note.off <= t:
+                        break
+                    out.append(note)
+                node = node.right
+        return sorted(out, key=lambda note: note.on)
+
+    def overlapping(self, start: int, stop: int) -> list[MidiNote]:
+        """notes which sound at some moment of window [start, stop)"""
+        out: list[MidiNote] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if stop <= node.center:
+                for note in node.by_on:
+                    if note.on >= stop:
+                        break
+                    out.append(note)
+                stack.append(node.left)
+            elif node.center < start:
+                for note in node.by_off:
+                    if note.off <= start:
+                        break
+                    out.append(note)
+                stack.append(node.right)
+            else:
+                out += node.by_on
+                stack += node.left, node.right
+        return sorted(out, key=lambda note: note.on)
+
+    def starting(self, start: int, stop: int) -> list[MidiNote]:
+        """notes with note on in window [start, stop)"""
+        return self.notes[bisect.bisect_left(self._ons, start):bisect.bisect_left(self._ons, stop)]
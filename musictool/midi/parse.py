@@ -1,8 +1,19 @@
+from __future__ import annotations
+
 import dataclasses
 import functools
 import heapq
+import itertools
+import operator
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+from typing import NamedTuple
 
 import mido
+import numpy as np
+import numpy.typing as npt
 
 from musictool.note import SpecificNote
 
@@ -29,29 +40,210 @@ class MidiNote:
         return hash((self.note, self.track))
 
 
+RawNote = tuple[int, int, int, int]  # on, off, pitch, track
+
+
+class _TrackNotes:
+    """
+    pairs note_on / note_off messages of single track
+    note_off is paired with latest unpaired note_on of same (channel, note)
+    notes are kept in note_on order
+    """
+
+    def __init__(self, track: int):
+        self.track = track
+        self.pending: deque[list[int]] = deque()  # [on, off, pitch, track], off == -1 while note is sounding
+        self.sounding: dict[tuple[int, int], list[list[int]]] = {}
+
+    def note_on(self, t: int, channel: int, pitch: int) -> None:
+        note = [t, -1, pitch, self.track]
+        self.pending.append(note)
+        self.sounding.setdefault((channel, pitch), []).append(note)
+
+    def note_off(self, t: int, channel: int, pitch: int) -> None:
+        if stack := self.sounding.get((channel, pitch)):
+            stack.pop()[1] = t
+
+    def pop_finished(self) -> Iterator[RawNote]:
+        """
+        yields notes which are finished and all notes started before them are finished too
+        notes started after earliest still sounding note stay pending, because they can't be yielded before it
+        """
+        while self.pending and self.pending[0][1] != -1:
+            on, off, pitch, track = self.pending.popleft()
+            yield on, off, pitch, track
+
+    def close(self, t: int) -> list[RawNote]:
+        """returns all remaining notes, notes without note_off are closed at time t (end of track)"""
+        out = [(on, t if off == -1 else off, pitch, track) for on, off, pitch, track in self.pending]
+        self.pending.clear()
+        self.sounding.clear()
+        return out
+
+
 def parse_notes(m: mido.MidiFile) -> list[MidiNote]:
-    notes: list[MidiNote] = []
+    """returns notes of all tracks sorted by note on time"""
+    tracks = []
     for track_i, track in enumerate(m.tracks):
         t = 0
-        t_buffer = {}
+        notes = _TrackNotes(track_i)
         for message in track:
             t += message.time
 
             if message.type == 'note_on' and message.velocity != 0:
-                t_buffer[message.note] = t
+                notes.note_on(t, message.channel, message.note)
 
             elif message.type == 'note_off' or (
                     message.type == 'note_on' and message.velocity == 0
             ):  # https://stackoverflow.com/a/43322203/4204843
-                # todo: heapq seems unnecessary here
-                heapq.heappush(
-                    notes, MidiNote(
-                        note=SpecificNote.from_i(message.note),
-                        on=t_buffer.pop(message.note), off=t,
-                        track=track_i,
-                    ),
-                )
-    return notes
+                notes.note_off(t, message.channel, message.note)
+        tracks.append(notes.close(t))
+    return [
+        MidiNote(note=SpecificNote.from_i(pitch), on=on, off=off, track=track_i)
+        for on, off, pitch, track_i in heapq.merge(*tracks, key=operator.itemgetter(0))
+    ]
+
+
+class NoteColumns(NamedTuple):
+    pitch: npt.NDArray[np.int16]
+    on: npt.NDArray[np.int64]
+    off: npt.NDArray[np.int64]
+    track: npt.NDArray[np.int16]
+
+
+class _ChunkReader:
+    """
+    reads chunk of a file in blocks of block_size bytes
+    file position is set before every read, so readers of different chunks can share one file object
+    """
+
+    def __init__(self, f: BinaryIO, offset: int, length: int, block_size: int):
+        self.f = f
+        self.offset = offset
+        self.remaining = length
+        self.block_size = block_size
+        self.buf = b''
+        self.pos = 0
+
+    def _fill(self) -> None:
+        n = min(self.block_size, self.remaining)
+        self.f.seek(self.offset)
+        self.buf = self.buf[self.pos:] + self.f.read(n)
+        self.offset += n
+        self.remaining -= n
+        self.pos = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.pos >= len(self.buf) and self.remaining == 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.buf):
+            self._fill()
+            if self.pos >= len(self.buf):
+                raise EOFError('unexpected end of track chunk')
+        b = self.buf[self.pos]
+        self.pos += 1
+        return b
+
+    def skip(self, n: int) -> None:
+        while n > 0:
+            if self.pos >= len(self.buf):
+                self._fill()
+                if self.pos >= len(self.buf):
+                    raise EOFError('unexpected end of track chunk')
+            k = min(n, len(self.buf) - self.pos)
+            self.pos += k
+            n -= k
+
+    def vlq(self) -> int:
+        """variable-length quantity"""
+        value = 0
+        while True:
+            b = self.byte()
+            value = value << 7 | b & 0x7F
+            if not b & 0x80:
+                return value
+
+
+def _track_chunks(f: BinaryIO) -> list[tuple[int, int]]:
+    chunks = []
+    if f.read(4) != b'MThd':
+        raise ValueError('not a standard MIDI file')
+    f.seek(int.from_bytes(f.read(4), 'big'), 1)
+    while len(header := f.read(8)) == 8:
+        length = int.from_bytes(header[4:], 'big')
+        if header[:4] == b'MTrk':
+            chunks.append((f.tell(), length))
+        f.seek(length, 1)
+    return chunks
+
+
+def track_chunks(path: str | Path) -> list[tuple[int, int]]:
+    """offsets and lengths of MTrk chunks, only chunk headers are read"""
+    with open(path, 'rb') as f:
+        return _track_chunks(f)
+
+
+def _iter_track(f: BinaryIO, offset: int, length: int, track: int, block_size: int) -> Iterator[RawNote]:
+    """
+    yields notes of one track ordered by note on time
+    a note is yielded once it and all notes started before it are finished,
+    so pending notes are those started since earliest still sounding note: a long held note delays all later notes of the track
+    """
+    notes = _TrackNotes(track)
+    t = 0
+    running_status = 0
+    r = _ChunkReader(f, offset, length, block_size)
+    while not r.exhausted:
+        t += r.vlq()
+        status = r.byte()
+        if status == 0xFF:
+            meta_type = r.byte()
+            r.skip(r.vlq())
+            if meta_type == 0x2F:  # end of track
+                break
+            continue
+        if status in {0xF0, 0xF7}:
+            r.skip(r.vlq())
+            continue
+        if status < 0x80:
+            data1 = status
+            status = running_status
+        else:
+            running_status = status
+            data1 = r.byte()
+        kind = status & 0xF0
+        if kind in {0xC0, 0xD0}:
+            continue
+        data2 = r.byte()
+        if kind == 0x90 and data2 != 0:
+            notes.note_on(t, status & 0x0F, data1)
+        elif kind == 0x80 or kind == 0x90:
+            notes.note_off(t, status & 0x0F, data1)
+            yield from notes.pop_finished()
+    yield from notes.close(t)
+
+
+def iter_raw_notes(path: str | Path, block_size: int = 2 ** 16) -> Iterator[RawNote]:
+    """(on, off, pitch, track) tuples of all tracks merged by on time, all tracks are read through single file object"""
+    with open(path, 'rb') as f:
+        tracks = [_iter_track(f, offset, length, i, block_size) for i, (offset, length) in enumerate(_track_chunks(f))]
+        yield from heapq.merge(*tracks, key=operator.itemgetter(0))
+
+
+def iter_notes(path: str | Path, block_size: int = 2 ** 16) -> Iterator[MidiNote]:
+    """streaming alternative to parse_notes: reads file incrementally and yields notes ordered by on time"""
+    for on, off, pitch, track in iter_raw_notes(path, block_size):
+        yield MidiNote(note=SpecificNote.from_i(pitch), on=on, off=off, track=track)
+
+
+def iter_note_columns(path: str | Path, batch_size: int = 2 ** 16, block_size: int = 2 ** 16) -> Iterator[NoteColumns]:
+    """yields notes ordered by on time in columnar batches of at most batch_size notes"""
+    notes = iter_raw_notes(path, block_size)
+    while batch := tuple(itertools.islice(notes, batch_size)):
+        on, off, pitch, track = np.array(batch, dtype=np.int64).T
+        yield NoteColumns(pitch=pitch.astype(np.int16), on=on, off=off, track=track.astype(np.int16))
 
 
 def print_midi(midi: mido.MidiFile) -> None:
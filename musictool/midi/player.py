@@ -1,24 +1,104 @@
+from __future__ import annotations
+
 import asyncio
 import functools
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
 from collections.abc import Iterable
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
+from typing import NamedTuple
 
 import mido
 
 from musictool.chord import SpecificChord
 from musictool.note import SpecificNote
+from musictool.progression import Progression
 from musictool.rhythm import Rhythm
 
 Playable = SpecificNote | SpecificChord
 
 
+class Event(NamedTuple):
+    seconds: float  # offset from start of playback
+    type: str  # note_on | note_off
+    note: int
+
+    @property
+    def sort_key(self) -> tuple[float, bool]:
+        """at same moment note_off goes first so repeated note is retriggered"""
+        return self.seconds, self.type == 'note_on'
+
+
+def _playable_codes(obj: Playable, bass_octave: int | None = None) -> list[int]:
+    if isinstance(obj, SpecificNote):
+        return [obj.i]
+    codes = list(obj.codes)
+    if bass_octave:
+        if obj.root is None:
+            raise ValueError('cannot play bass when root is None')
+        codes.append(SpecificNote(obj.root, bass_octave).i)
+    return codes
+
+
+def playable_events(obj: Playable, seconds: float = 1, start: float = 0, bass_octave: int | None = None) -> list[Event]:
+    codes = _playable_codes(obj, bass_octave)
+    return [Event(start, 'note_on', code) for code in codes] + [Event(start + seconds, 'note_off', code) for code in codes]
+
+
+def progression_events(progression: Iterable[Playable], seconds: float = 1, bass_octave: int | None = None) -> Iterator[Event]:
+    """lazy, events are yielded in playback order"""
+    for i, obj in enumerate(progression):
+        yield from playable_events(obj, seconds, start=i * seconds, bass_octave=bass_octave)
+
+
+def rhythm_events(rhythm: Rhythm, bars: Iterable[Playable]) -> Iterator[Event]:
+    """plays rhythm once per item of bars (e.g. Progression), lazy, events are yielded in playback order"""
+    for i, obj in enumerate(bars):
+        codes = _playable_codes(obj)
+        for step, is_play in enumerate(rhythm.notes):
+            if not is_play:
+                continue
+            # computed from integer step index, so floating point error does not accumulate over long sequences
+            on = (i * rhythm.bar_notes + step) * rhythm.note_seconds
+            off = (i * rhythm.bar_notes + step + 1) * rhythm.note_seconds
+            yield from (Event(on, 'note_on', code) for code in codes)
+            yield from (Event(off, 'note_off', code) for code in codes)
+
+
 class Player:
-    def __init__(self, midi_device: str | None = None) -> None:
-        if midi_device is None:
-            self.send_message = self._print_message
-        else:
-            self.port = mido.open_output(midi_device)
-            self.send_message = self._send_message
+    """
+    all events are scheduled at absolute deadlines computed from single monotonic clock taken at playback start
+    so event loop jitter delays single group of events but never accumulates over long sequences
+    events with same deadline are grouped: their messages are built in advance, then group waits once and messages are sent back to back
+    """
+
+    def __init__(
+        self,
+        midi_device: str | None = None,
+        port: Any = None,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        resolution: float = 1e-4,
+    ) -> None:
+        """
+        :param port: any object with mido-like send(message) method, used instead of opening midi_device
+        :param clock: monotonic clock in seconds
+        :param sleep: coroutine function which waits given number of seconds of clock,
+                      clock and sleep should be replaced together (e.g. with virtual time in tests)
+        :param resolution: events closer than resolution seconds are grouped
+        """
+        if midi_device is not None:
+            port = mido.open_output(midi_device)
+        self.port = port
+        self.send_message = self._print_message if port is None else self._send_message
+        self.clock = clock
+        self.sleep = sleep
+        self.resolution = resolution
 
     def _print_message(self, *args: str | int, note: int, **kwargs: str | int) -> None:
         print('MIDI_DEVICE not found |', *args, f'{note=},', ', '.join(f'{k}={v!r}' for k, v in kwargs.items()))
@@ -27,24 +107,79 @@ class Player:
         note += 24  # to match ableton octaves
         self.port.send(mido.Message(*args, note=note, **kwargs))
 
+    def _prepare(self, group: list[Event]) -> list[Any]:
+        """messages are built before waiting for deadline, so only sending is left at deadline"""
+        if self.port is None:
+            return group
+        return [mido.Message(event.type, note=event.note + 24, channel=0) for event in group]
+
+    def _send(self, messages: list[Any]) -> None:
+        if self.port is None:
+            for event in messages:
+                self._print_message(event.type, note=event.note, channel=0)
+            return
+        send = self.port.send
+        for message in messages:
+            send(message)
+
+    async def _wait_until(self, deadline: float) -> None:
+        """sleeps again if woken up early, never busy-waits, so other tasks keep running"""
+        while (delay := deadline - self.clock()) > 0:
+            await self.sleep(delay)
+
+    async def play_events(self, events: Iterable[Event], lookahead: float = 0.5) -> None:
+        """
+        events can be lazy iterable, only events within lookahead seconds from now are pulled into queue
+        events are expected to be roughly ordered: events pulled late (earlier than already sent ones) are sent immediately
+        """
+        it = iter(events)
+        queue: list[tuple[tuple[float, bool], int, Event]] = []
+        counter = itertools.count()  # tie-breaker, events are never compared
+        exhausted = False
+        pulled = float('-inf')  # time of most recently pulled event
+        start = self.clock()
+
+        while True:
+            horizon = self.clock() - start + lookahead
+            while not exhausted and (not queue or pulled <= horizon):
+                event = next(it, None)
+                if event is None:
+                    exhausted = True
+                    break
+                pulled = event.seconds
+                heapq.heappush(queue, (event.sort_key, next(counter), event))
+            if not queue:
+                return
+
+            first = heapq.heappop(queue)[2]
+            group = [first]
+            while queue and queue[0][2].seconds - first.seconds < self.resolution:
+                group.append(heapq.heappop(queue)[2])
+            messages = self._prepare(group)
+            await self._wait_until(start + first.seconds)
+            self._send(messages)
+
     @functools.singledispatchmethod
     async def play(self, obj: Playable, seconds: float = 1) -> None:
         ...
 
     @play.register
     async def _(self, obj: SpecificNote, seconds: float = 1) -> None:
-        self.send_message('note_on', note=obj.i, channel=0)
-        await asyncio.sleep(seconds)
-        self.send_message('note_off', note=obj.i, channel=0)
+        await self.play_events(playable_events(obj, seconds))
 
     @play.register
     async def _(self, obj: SpecificChord, seconds: float = 1, bass_octave: int | None = None) -> None:
-        tasks = [self.play(note, seconds) for note in obj.notes]
-        if bass_octave:
-            if obj.root is None:
-                raise ValueError('cannot play bass when root is None')
-            tasks.append(self.play(SpecificNote(obj.root, bass_octave), seconds))
-        await asyncio.gather(*tasks)
+        await self.play_events(playable_events(obj, seconds, bass_octave=bass_octave))
+
+    @play.register
+    async def _(self, obj: Progression, seconds: float = 1, bass_octave: int | None = None) -> None:
+        await self.play_events(progression_events(obj, seconds, bass_octave=bass_octave))
+
+    async def play_rhythm(self, rhythm: Rhythm, bars: Playable | Iterable[Playable]) -> None:
+        """bars is single note/chord (played for one bar) or iterable of them (e.g. Progression), one bar per item"""
+        if isinstance(bars, SpecificNote | SpecificChord):
+            bars = (bars,)
+        await self.play_events(rhythm_events(rhythm, bars))
 
 
 def chord_to_midi(
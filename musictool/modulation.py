@@ -0,0 +1,109 @@
+"""
+modulation routes between scales of same kind
+
+scales are nodes of a graph, there is an edge between scales which differ by at most max_changed notes
+edge cost is step_cost + number of changed notes + triad_weight * number of triads of left scale which are lost (diatonic only)
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+
+import numpy as np
+import numpy.typing as npt
+
+from musictool.scale import NeighborTable
+from musictool.scale import Scale
+from musictool.scale import neighbor_tables
+
+FloatMatrix = npt.NDArray[np.float64]
+
+
+def shared_triads(table: NeighborTable) -> npt.NDArray[np.int_]:
+    """out[i, j] is number of triads shared by table.scales[i] and table.scales[j]"""
+    ids: dict[object, int] = {}
+    rows = [[ids.setdefault(triad, len(ids)) for triad in scale.triads] for scale in table.scales]
+    has = np.zeros((len(rows), len(ids)), dtype=np.int_)
+    for i, row in enumerate(rows):
+        has[i, row] = 1
+    return has @ has.T  # type: ignore[no-any-return]
+
+
+class ModulationGraph:
+    """
+    shortest paths are found with Dijkstra over precomputed adjacency lists
+    result of search from each source (distances and predecessors to all scales) is cached,
+    so after all_pairs() every query is just path reconstruction
+    """
+
+    def __init__(self, kind: str, max_changed: int = 1, step_cost: float = 1, triad_weight: float = 0.5):
+        if max_changed < 1:
+            raise ValueError('max_changed should be positive')
+        self.kind = kind
+        self.table = neighbor_tables[kind]
+        self.scales = self.table.scales
+        n_notes = len(self.scales[0])
+        changed = n_notes - self.table.shared.astype(np.int_)
+        cost = step_cost + changed.astype(np.float64)
+        if kind == 'diatonic' and triad_weight:
+            cost += triad_weight * (n_notes - shared_triads(self.table))
+        is_edge = changed <= max_changed
+        np.fill_diagonal(is_edge, False)
+        self.cost: FloatMatrix = np.where(is_edge, cost, np.inf)
+        self.adjacency = tuple(
+            tuple(zip(np.flatnonzero(row).tolist(), self.cost[i, row].tolist(), strict=True))
+            for i, row in enumerate(is_edge)
+        )
+        self._searches: dict[int, tuple[list[float], list[int]]] = {}
+
+    def _search(self, source: int) -> tuple[list[float], list[int]]:
+        """Dijkstra from source, returns distances and predecessors (-1 for source and unreachable scales)"""
+        if (cached := self._searches.get(source)) is not None:
+            return cached
+        dist = [float('inf')] * len(self.scales)
+        pred = [-1] * len(self.scales)
+        dist[source] = 0
+        queue = [(0.0, source)]
+        while queue:
+            d, i = heapq.heappop(queue)
+            if d > dist[i]:
+                continue
+            for j, cost in self.adjacency[i]:
+                if d + cost < dist[j]:
+                    dist[j] = d + cost
+                    pred[j] = i
+                    heapq.heappush(queue, (dist[j], j))
+        self._searches[source] = dist, pred
+        return dist, pred
+
+    def distance(self, source: Scale, target: Scale) -> float:
+        """cost of cheapest route, inf if target is unreachable"""
+        return self._search(self.table.index[source])[0][self.table.index[target]]
+
+    def path(self, source: Scale, target: Scale) -> tuple[Scale, ...]:
+        """one of cheapest routes, both ends included"""
+        i, j = self.table.index[source], self.table.index[target]
+        dist, pred = self._search(i)
+        if dist[j] == float('inf'):
+            raise ValueError(f'no modulation path from {source} to {target}')
+        path = [j]
+        while path[-1] != i:
+            path.append(pred[path[-1]])
+        return tuple(self.scales[k] for k in reversed(path))
+
+    def all_pairs(self) -> FloatMatrix:
+        """runs search from every scale, out[i, j] is cost of cheapest route from scales[i] to scales[j]"""
+        return np.array([self._search(i)[0] for i in range(len(self.scales))])
+
+
+@functools.cache
+def modulation_graph(kind: str, max_changed: int = 1, step_cost: float = 1, triad_weight: float = 0.5) -> ModulationGraph:
+    """graphs (and their cached searches) are shared per kind and cost parameters"""
+    return ModulationGraph(kind, max_changed, step_cost, triad_weight)
+
+
+def modulation_path(source: Scale, target: Scale, max_changed: int = 1, step_cost: float = 1, triad_weight: float = 0.5) -> tuple[Scale, ...]:
+    if source.kind != target.kind:
+        raise ValueError('scales should be of same kind')
+    return modulation_graph(source.kind, max_changed, step_cost, triad_weight).path(source, target)
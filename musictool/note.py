@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import functools
 from collections.abc import Iterable
 from typing import overload
 
@@ -8,7 +7,6 @@ from musictool import config
 from musictool.util.cache import Cached
 
 
-@functools.total_ordering
 class Note(Cached):
     """
     abstract note, no octave/key
@@ -23,7 +21,7 @@ class Note(Cached):
 
     @classmethod
     def from_i(cls, i: int) -> Note:
-        return cls(config.chromatic_notes[i % 12])
+        return NOTES[i % 12]
 
     def __repr__(self) -> str:
         return f'Note(name={self.name})'
@@ -36,19 +34,39 @@ class Note(Cached):
         else:
             return NotImplemented
 
-    def __lt__(self, other: object) -> bool:
+    def _other_i(self, other: object) -> int | None:
         if isinstance(other, str):
-            return self.i <= config.note_i[other]
+            return config.note_i[other]
         elif isinstance(other, Note):
-            return self.i <= other.i
+            return other.i
         else:
+            return None
+
+    def __lt__(self, other: object) -> bool:
+        if (other_i := self._other_i(other)) is None:
             return NotImplemented
+        return self.i < other_i
+
+    def __le__(self, other: object) -> bool:
+        if (other_i := self._other_i(other)) is None:
+            return NotImplemented
+        return self.i <= other_i
+
+    def __gt__(self, other: object) -> bool:
+        if (other_i := self._other_i(other)) is None:
+            return NotImplemented
+        return self.i > other_i
+
+    def __ge__(self, other: object) -> bool:
+        if (other_i := self._other_i(other)) is None:
+            return NotImplemented
+        return self.i >= other_i
 
     def __hash__(self) -> int:
         return hash(self.name)
 
     def __add__(self, other: int) -> Note:
-        return Note.from_i(self.i + other)
+        return NOTE_ADD[self.i][other % 12]
 
     @overload
     def __sub__(self, other: Note) -> int:
@@ -76,8 +94,12 @@ class Note(Cached):
         return self.name,
 
 
-@functools.total_ordering
 class SpecificNote(Cached):
+    @classmethod
+    def _cache_key(cls, abstract: Note | str, octave: int) -> int:  # type: ignore[override]
+        """MIDI code, so positional/keyword arguments and str/Note abstract give same instance"""
+        return octave * 12 + (abstract.i if isinstance(abstract, Note) else config.note_i[abstract])
+
     def __init__(self, abstract: Note | str, octave: int):
         """
         :param octave: in midi format (C5-midi == C3-ableton)
@@ -92,8 +114,10 @@ class SpecificNote(Cached):
 
     @classmethod
     def from_i(cls, i: int) -> SpecificNote:
+        if 0 <= i < N_MIDI_NOTES:
+            return SPECIFIC_NOTES[i]
         div, mod = divmod(i, 12)
-        return cls(Note(config.chromatic_notes[mod]), octave=div)
+        return cls(NOTES[mod], octave=div)
 
     @classmethod
     def from_str(cls, string: str) -> SpecificNote:
@@ -104,7 +128,7 @@ class SpecificNote(Cached):
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, SpecificNote):
-            return self._key == other._key
+            return self.i == other.i
         elif isinstance(other, str):
             return self._key == SpecificNote.from_str(other)._key
         else:
@@ -118,6 +142,21 @@ class SpecificNote(Cached):
             return NotImplemented
         return self.i < other.i
 
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, SpecificNote):
+            return NotImplemented
+        return self.i <= other.i
+
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, SpecificNote):
+            return NotImplemented
+        return self.i > other.i
+
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, SpecificNote):
+            return NotImplemented
+        return self.i >= other.i
+
     @overload
     def __sub__(self, other: SpecificNote) -> int:
         ...
@@ -137,7 +176,10 @@ class SpecificNote(Cached):
 
     def __add__(self, other: int) -> SpecificNote:
         """C + 7 = G"""
-        return SpecificNote.from_i(self.i + other)
+        i = self.i + other
+        if 0 <= i < N_MIDI_NOTES:
+            return SPECIFIC_NOTES[i]
+        return SpecificNote.from_i(i)
 
     @staticmethod
     def to_abstract(notes: Iterable[SpecificNote]) -> frozenset[Note]:
@@ -158,5 +200,11 @@ def str_to_note(note: str) -> Note | SpecificNote:
     return SpecificNote.from_str(note)
 
 
+# preallocated interned notes, from_i and addition are lookups instead of constructor calls
+NOTES = tuple(Note(name) for name in config.chromatic_notes)
+NOTE_ADD = tuple(tuple(NOTES[(i + j) % 12] for j in range(12)) for i in range(12))  # NOTE_ADD[i][j] is NOTES[i] + j
+N_MIDI_NOTES = 128
+SPECIFIC_NOTES = tuple(SpecificNote(NOTES[i % 12], i // 12) for i in range(N_MIDI_NOTES))  # SPECIFIC_NOTES[i].i == i
+
 WHITE_NOTES = frozenset(map(Note, 'CDEFGAB'))
 BLACK_NOTES = frozenset(map(Note, 'defab'))
@@ -1,17 +1,40 @@
 from __future__ import annotations
 
+import functools
 from collections.abc import Iterator
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
 from typing import overload
 
+import numpy as np
+import numpy.typing as npt
+
 from musictool import config
 from musictool.card import Card
+from musictool.card import CardData
 from musictool.note import SpecificNote
 from musictool.noteset import NoteSet
+from musictool.noteset import mask_to_intervals_ascending
+
+if TYPE_CHECKING:
+    from musictool.piano import Piano
 
 CHROMATIC_NOTESET = NoteSet.from_str(config.chromatic_notes)
 
 
+@functools.cache
+def offset_table(mask: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """
+    pitch classes of noteset (ascending from C) and position of each of 12 pitch classes among them (-1 if not in noteset)
+    all noteranges over same noteset share the table
+    """
+    pitch_classes = mask_to_intervals_ascending(mask)
+    index = [-1] * 12
+    for i, pitch_class in enumerate(pitch_classes):
+        index[pitch_class] = i
+    return pitch_classes, tuple(index)
+
+
 class NoteRange(Sequence[SpecificNote], Card):
     def __init__(
         self,
@@ -35,13 +58,24 @@ class NoteRange(Sequence[SpecificNote], Card):
         self.stop = stop
         self.noteset = noteset
         self._key = self.start, self.stop, self.noteset
+        self._pitch_classes, self._pitch_class_index = offset_table(noteset.mask)
+        self._start_ordinal = self._ordinal(start.i)
+        self._len = self._ordinal(stop.i) - self._start_ordinal + 1
+
+    def _ordinal(self, code: int) -> int:
+        """position of note (given by MIDI code) among all notes of noteset, counting from C of octave 0"""
+        octave, pitch_class = divmod(code, 12)
+        return octave * len(self._pitch_classes) + self._pitch_class_index[pitch_class]
+
+    def _code(self, ordinal: int) -> int:
+        octave, i = divmod(ordinal, len(self._pitch_classes))
+        return octave * 12 + self._pitch_classes[i]
 
     def _getitem_int(self, item: int) -> SpecificNote:
-        if 0 <= item < len(self):
-            q = self.noteset.add_note(self.start, item)
-            return q
-        elif -len(self) <= item < 0:
-            return self.noteset.add_note(self.stop, item + 1)
+        if 0 <= item < self._len:
+            return SpecificNote.from_i(self._code(self._start_ordinal + item))
+        elif -self._len <= item < 0:
+            return SpecificNote.from_i(self._code(self._start_ordinal + self._len + item))
         else:
             raise IndexError('index out of range')
 
@@ -69,16 +103,32 @@ class NoteRange(Sequence[SpecificNote], Card):
     def __contains__(self, item: object) -> bool:
         if not isinstance(item, SpecificNote):
             return False
-        return item.abstract in self.noteset and self.start <= item <= self.stop
+        return self._pitch_class_index[item.abstract.i] != -1 and self.start.i <= item.i <= self.stop.i
+
+    def index(self, value: object, start: int = 0, stop: int | None = None) -> int:
+        if value not in self:
+            raise ValueError(f'{value} is not in noterange')
+        i = self._ordinal(value.i) - self._start_ordinal  # type: ignore[attr-defined]
+        if not start <= i < (self._len if stop is None else stop):
+            raise ValueError(f'{value} is not in noterange[{start}:{stop}]')
+        return i
+
+    def count(self, value: object) -> int:
+        return int(value in self)
 
     def __iter__(self) -> Iterator[SpecificNote]:
-        return (self[i] for i in range(len(self)))
+        return map(SpecificNote.from_i, self.to_midi_array().tolist())
+
+    def to_midi_array(self) -> npt.NDArray[np.int16]:
+        """MIDI codes of all notes"""
+        octave, i = np.divmod(np.arange(self._start_ordinal, self._start_ordinal + self._len), len(self._pitch_classes))
+        return (octave * 12 + np.array(self._pitch_classes)[i]).astype(np.int16)  # type: ignore[no-any-return]
 
     def __repr__(self) -> str:
         return f'NoteRange({self.start}, {self.stop}, noteset={self.noteset})'
 
     def __len__(self) -> int:
-        return self.noteset.subtract(self.stop, self.start) + 1
+        return self._len
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, NoteRange):
@@ -88,27 +138,27 @@ class NoteRange(Sequence[SpecificNote], Card):
     def __hash__(self) -> int:
         return hash(self._key)
 
-    def to_piano_image(self) -> str:
+    def to_piano(self) -> Piano:
         from musictool.piano import Piano  # hack to fix circular import
         return Piano(
             note_colors=None if self.noteset is CHROMATIC_NOTESET else dict.fromkeys(self.noteset, config.RED),
             squares={self.start: {'text': str(self.start), 'text_size': '8'}, self.stop: {'text': str(self.stop), 'text_size': '8'}},
             noterange=NoteRange(self.start, self.stop),
-        )._repr_svg_()
+        )
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = ('card',),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
-        return self.repr_card(
+    ) -> CardData:
+        return CardData(
             html_classes=html_classes,
             title=title or f'NoteRange({self.start}, {self.stop})',
             subtitle=subtitle,
             header_href=header_href,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
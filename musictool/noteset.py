@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import functools
 import random
+from collections.abc import Iterable
 from collections.abc import Iterator
+from typing import TYPE_CHECKING
+from typing import Any
 from typing import TypeVar
 from typing import no_type_check
 from typing import overload
@@ -10,6 +14,7 @@ import pipe21 as P
 
 from musictool import config
 from musictool.card import Card
+from musictool.card import CardData
 from musictool.config import RED
 from musictool.note import AnyNote
 from musictool.note import Note
@@ -18,6 +23,11 @@ from musictool.note import str_to_note
 from musictool.util import typeguards
 from musictool.util.cache import Cached
 
+if TYPE_CHECKING:
+    from musictool.piano import Piano
+
+CHROMATIC_MASK = 0xFFF
+
 
 @no_type_check
 def bits_to_intervals(bits: str) -> frozenset[int]:
@@ -38,6 +48,43 @@ def intervals_to_bits(intervals: frozenset[int]) -> str:
     return ''.join(bits)
 
 
+def intervals_to_mask(intervals: Iterable[int]) -> int:
+    """12-bit integer mask, bit i is set if interval i (or pitch class i) is present"""
+    mask = 0
+    for i in intervals:
+        mask |= 1 << i
+    return mask
+
+
+def notes_to_mask(notes: Iterable[Note]) -> int:
+    return intervals_to_mask(note.i for note in notes)
+
+
+def rotate_mask(mask: int, n: int) -> int:
+    """transpose pitch-class mask n semitones up (n can be negative)"""
+    n %= 12
+    return (mask << n | mask >> (12 - n)) & CHROMATIC_MASK
+
+
+def mask_to_bits(mask: int) -> str:
+    return format(mask, '012b')[::-1]
+
+
+@functools.cache
+def mask_to_intervals_ascending(mask: int) -> tuple[int, ...]:
+    return tuple(i for i in range(12) if mask >> i & 1)
+
+
+@functools.cache
+def mask_to_notes_ascending(mask: int) -> tuple[Note, ...]:
+    return tuple(Note.from_i(i) for i in mask_to_intervals_ascending(mask))
+
+
+@functools.cache
+def mask_to_notes(mask: int) -> frozenset[Note]:
+    return frozenset(mask_to_notes_ascending(mask))
+
+
 Self = TypeVar('Self', bound='NoteSet')
 
 
@@ -55,10 +102,14 @@ class NoteSet(Cached, Card):
     """
     intervals_to_name: dict[frozenset[int], str] = {}
     name_to_intervals: dict[str, frozenset[int]] = {}
+    _mask_to_name: dict[int, str] = {}
 
     notes: frozenset[Note]
     root: Note | None
-    intervals_ascending: tuple[int, ...] | tuple[()]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._mask_to_name = {intervals_to_mask(k): v for k, v in cls.intervals_to_name.items()}
 
     def __init__(
         self,
@@ -78,37 +129,60 @@ class NoteSet(Cached, Card):
         else:
             raise TypeError
 
-        self.notes_octave_fit = tuple(sorted(self.notes))
+        self.mask = notes_to_mask(self.notes)
 
         if root is None:
-            self.root = root
-            self.notes_ascending = self.notes_octave_fit
-            self.intervals_ascending = ()
+            self.intervals_mask = 0
         elif not isinstance(root, Note):
             raise TypeError('root type should be Note | None')
-        elif root not in self.notes:
+        elif not self.mask >> root.i & 1:
             raise KeyError('root should be one of notes')
         else:
-            self.root = root
-            root_i = self.notes_octave_fit.index(self.root)
-            self.notes_ascending = self.notes_octave_fit[root_i:] + self.notes_octave_fit[:root_i]
-            self.intervals_ascending = tuple(note - self.root for note in self.notes_ascending)
-        self.intervals = frozenset(self.intervals_ascending)
-        self.note_to_interval = dict(zip(self.notes_ascending, self.intervals_ascending))
-        self.bits = intervals_to_bits(self.intervals)
-        self.name = self.__class__.intervals_to_name.get(self.intervals)
-
-        self.key = self.notes, self.root
-        self.note_i = {note: i for i, note in enumerate(self.notes_ascending)}
+            self.intervals_mask = rotate_mask(self.mask, -root.i)
+        self.root = root
+        self.name = self.__class__._mask_to_name.get(self.intervals_mask)
+        self.key = self.mask, self.root
+
+    @functools.cached_property
+    def notes_octave_fit(self) -> tuple[Note, ...]:
+        return mask_to_notes_ascending(self.mask)
+
+    @functools.cached_property
+    def notes_ascending(self) -> tuple[Note, ...]:
+        if self.root is None:
+            return self.notes_octave_fit
+        return tuple(self.root + interval for interval in self.intervals_ascending)
+
+    @functools.cached_property
+    def intervals_ascending(self) -> tuple[int, ...] | tuple[()]:
+        return mask_to_intervals_ascending(self.intervals_mask)
+
+    @functools.cached_property
+    def intervals(self) -> frozenset[int]:
+        return frozenset(self.intervals_ascending)
+
+    @functools.cached_property
+    def note_to_interval(self) -> dict[Note, int]:
+        return dict(zip(self.notes_ascending, self.intervals_ascending))
+
+    @functools.cached_property
+    def bits(self) -> str:
+        return mask_to_bits(self.intervals_mask)
+
+    @functools.cached_property
+    def note_i(self) -> dict[Note, int]:
+        return {note: i for i, note in enumerate(self.notes_ascending)}
 
     @property
     def rootless(self) -> NoteSet:
         return NoteSet(self.notes)
 
-    def transpose_to(self, note: Note) -> NoteSet:
+    def transpose_to(self, note: str | Note) -> NoteSet:
         if self.root is None:
             raise ValueError('noteset should have root to be transposed')
-        return NoteSet.from_intervals(self.intervals, note)
+        if isinstance(note, str):
+            note = Note(note)
+        return NoteSet(mask_to_notes(rotate_mask(self.intervals_mask, note.i)), root=note)
 
     @classmethod
     def from_name(cls: type[Self], root: str | Note, name: str) -> Self:
@@ -160,7 +234,7 @@ class NoteSet(Cached, Card):
             return notes[(notes.index(note) + steps) % len(notes)]
         elif isinstance(note, SpecificNote):
             octaves, i = divmod(self.notes_octave_fit.index(note.abstract) + steps, len(self.notes))
-            return SpecificNote(self.notes_octave_fit[i], octave=note.octave + octaves)
+            return SpecificNote.from_i((note.octave + octaves) * 12 + self.notes_octave_fit[i].i)
         else:
             raise TypeError
 
@@ -186,7 +260,7 @@ class NoteSet(Cached, Card):
         return hash(self.key)
 
     def __len__(self) -> int:
-        return len(self.notes)
+        return self.mask.bit_count()
 
     def __getitem__(self, item: int) -> Note:
         return self.notes_ascending[item]
@@ -197,17 +271,17 @@ class NoteSet(Cached, Card):
     def __contains__(self, item: object) -> bool:
         if not isinstance(item, Note):
             return NotImplemented
-        return item in self.notes
+        return bool(self.mask >> item.i & 1)
 
     def __le__(self, other: object) -> bool:
         if not isinstance(other, NoteSet):
             return NotImplemented
-        return self.notes <= other.notes
+        return self.mask & ~other.mask == 0
 
     def __ge__(self, other: object) -> bool:
         if not isinstance(other, NoteSet):
             return NotImplemented
-        return other.notes <= self.notes
+        return other.mask & ~self.mask == 0
 
     def __repr__(self) -> str:
         x = ''.join(note.name for note in self)
@@ -215,25 +289,25 @@ class NoteSet(Cached, Card):
             return f'{x}/{self.root.name}'
         return x
 
-    def to_piano_image(self) -> str:
+    def to_piano(self) -> Piano:
         from musictool.piano import Piano  # hack to fix circular import
-        return Piano(note_colors={note: RED for note in self})._repr_svg_()
+        return Piano(note_colors={note: RED for note in self})
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = (),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
-        return self.repr_card(
+    ) -> CardData:
+        return CardData(
             html_classes=html_classes,
             title=title or repr(self),
             subtitle=subtitle,
             header_href=header_href,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
 
     def __getnewargs_ex__(self) -> tuple[tuple[frozenset[Note]], dict[str, Note | None]]:
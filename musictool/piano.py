@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import functools
+from typing import Any
+from typing import NamedTuple
 from typing import TypedDict
 from xml.etree import ElementTree
 
@@ -37,8 +40,162 @@ class SquaresPayload(TypedDict, total=False):
     onclick: str
 
 
+class KeyGeometry(NamedTuple):
+    x: int  # x coordinate of note rect
+    w: int  # width of note rect
+    h: int  # height of note rect
+    sx: int  # x coordinate of square
+    sy: int  # y coordinate of square
+
+
+class Layout(NamedTuple):
+    notes: tuple[SpecificNote, ...]  # drawing order: black keys after white keys so they are drawn on top
+    white_notes: tuple[SpecificNote, ...]
+    black_notes: tuple[SpecificNote, ...]
+    geometry: dict[SpecificNote, KeyGeometry]
+    size: tuple[int, int]
+
+
+@functools.lru_cache(maxsize=256)
+def layout(noterange: NoteRange, black_small: bool, ww: int, wh: int, square_size: int) -> Layout:
+    """key geometry depends only on these arguments, so it is computed once and shared by all pianos"""
+    notes = tuple(noterange)
+    white_notes = tuple(note for note in notes if note.abstract in WHITE_NOTES)
+    black_notes = tuple(note for note in notes if note.abstract in BLACK_NOTES)
+    geometry = {}
+
+    def white_key(x: int) -> KeyGeometry:
+        return KeyGeometry(x, ww, wh, (x + x + ww) // 2 - square_size // 2, wh - square_size - 5)
+
+    if black_small:
+        bw, bh = int(ww * 0.6), int(wh * 0.6)
+        white_x = {note: ww * i for i, note in enumerate(white_notes)}
+        for note in white_notes:
+            geometry[note] = white_key(white_x[note])
+        for note in black_notes:
+            right_white_x = white_x[note + 1]
+            geometry[note] = KeyGeometry(right_white_x - bw // 2, bw, bh, right_white_x - square_size // 2, bh - square_size - 3)
+        return Layout(white_notes + black_notes, white_notes, black_notes, geometry, (ww * len(white_notes), wh))
+
+    for i, note in enumerate(notes):
+        geometry[note] = white_key(ww * i)
+    return Layout(notes, white_notes, black_notes, geometry, (ww * len(notes), wh))
+
+
+# everything that is drawn on a key: color, href, onclick, top rect color, square payload items
+KeyPayload = tuple[int, str | None, str | None, int | None, tuple[tuple[str, Any], ...] | None]
+LayoutArgs = tuple[NoteRange, bool, int, int, int]
+RenderKey = tuple[LayoutArgs, int, tuple[KeyPayload, ...]]
+
+
+def _key_rects(note: SpecificNote, geometry: KeyGeometry, payload: KeyPayload, top_rect_height: int, square_size: int) -> list[str]:
+    x, w, h, sx, sy = geometry
+    c, note_href, note_onclick, rect_color, square = payload
+    rects = []
+
+    # draw key
+    onclick_attr = f' onclick="{note_onclick}"' if note_onclick else ''
+    note_rect = f"""<rect class='note' note='{note}' x='{x}' y='0' width='{w}' height='{h}' style='fill:{colortool.css_hex(c)};stroke-width:1;stroke:{colortool.css_hex(BLACK_PALE)}'{onclick_attr}/>"""
+    if note_href:
+        note_rect = f"<a href='{note_href}'>{note_rect}</a>"
+    rects.append(note_rect)
+
+    # draw rectangle on top of note
+    if rect_color:
+        rects.append(f"""<rect class='top_rect' note='{note}' x='{x}' y='0' width='{w}' height='{top_rect_height}' style='fill:{colortool.css_hex(rect_color)};'/>""")
+
+    # draw squares on notes
+    if square:
+        payload_ = dict(square)
+        fill_color = colortool.css_hex(payload_.get('fill_color', WHITE_BRIGHT))
+        border_color = colortool.css_hex(payload_.get('border_color', BLACK_BRIGHT))
+
+        onclick = payload_.get('onclick')
+        onclick = f" onclick='{onclick}'" if onclick else ''
+
+        rect = f"<rect class='square' note='{note}' x='{sx}' y='{sy}' width='{square_size}' height='{square_size}' style='fill:{fill_color};stroke-width:1;stroke:{border_color}'/>"
+
+        if text := payload_.get('text'):
+            text_color = colortool.css_hex(payload_.get('text_color', BLACK_BRIGHT))
+            text_size = payload_.get('text_size', '15')
+            rect += f"<text class='square' note='{note}' x='{sx}' y='{sy + square_size}' font-family=\"Menlo\" font-size='{text_size}' style='fill:{text_color}'>{text}</text>"
+
+        rects.append(f"<g class='square' note='{note}'{onclick}>{rect}</g>")
+    return rects
+
+
+def _border_rect(size: tuple[int, int]) -> str:
+    """border around whole svg"""
+    return f"<rect x='0' y='0' width='{size[0] - 1}' height='{size[1] - 1}' style='fill:none;stroke-width:1;stroke:{colortool.css_hex(BLACK_PALE)}'/>"
+
+
+def default_payload(note: SpecificNote) -> KeyPayload:
+    return note_color(note), None, None, None, None
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_rects(key: RenderKey) -> tuple[str, ...]:
+    layout_args, top_rect_height, payloads = key
+    layout_ = layout(*layout_args)
+    rects = []
+    for note, payload in zip(layout_.notes, payloads, strict=True):
+        rects += _key_rects(note, layout_.geometry[note], payload, top_rect_height, layout_args[-1])
+    rects.append(_border_rect(layout_.size))
+    return tuple(rects)
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_svg(key: RenderKey, pretty: bool) -> str:
+    if pretty:
+        return Piano.pretty_print(_render_svg(key, pretty=False))
+    width, height = layout(*key[0]).size
+    return f"<svg width='{width}' height='{height}'>{''.join(_render_rects(key))}</svg>"
+
+
+def template_defs(layout_args: LayoutArgs, template_id: str) -> str:
+    """
+    keys with default payload, to be referenced by Piano.svg_use
+    white and black keys are separate groups, so keys drawn on top of white keys are still covered by black keys
+    """
+    layout_ = layout(*layout_args)
+    groups: dict[str, list[str]] = {'white': [], 'black': []}
+    for note in layout_.notes:
+        group = 'white' if note in layout_.white_notes else 'black'
+        groups[group] += _key_rects(note, layout_.geometry[note], default_payload(note), 0, layout_args[-1])
+    return (
+        f"<g id='{template_id}-white'>{''.join(groups['white'])}</g>"
+        f"<g id='{template_id}-black'>{''.join(groups['black'])}</g>"
+        f"<g id='{template_id}-border'>{_border_rect(layout_.size)}</g>"
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_svg_use(key: RenderKey, template_id: str) -> str:
+    layout_args, top_rect_height, payloads = key
+    layout_ = layout(*layout_args)
+    groups: dict[str, list[str]] = {'white': [], 'black': []}
+    for note, payload in zip(layout_.notes, payloads, strict=True):
+        if payload == default_payload(note):
+            continue
+        group = 'white' if note in layout_.white_notes else 'black'
+        groups[group] += _key_rects(note, layout_.geometry[note], payload, top_rect_height, layout_args[-1])
+    width, height = layout_.size
+    return (
+        f"<svg width='{width}' height='{height}'>"
+        f"<use href='#{template_id}-white'/>{''.join(groups['white'])}"
+        f"<use href='#{template_id}-black'/>{''.join(groups['black'])}"
+        f"<use href='#{template_id}-border'/>"
+        '</svg>'
+    )
+
+
 class Piano:
-    def __init__(  # noqa: C901
+    """
+    key geometry is cached per noterange and sizes (see layout)
+    rendered svg is cached per everything drawn on the keys, so pianos with same colors and squares are rendered once
+    """
+
+    def __init__(
         self,
         note_colors: dict[Note | SpecificNote, int] | None = None,
         note_hrefs: dict[Note | SpecificNote, str] | None = None,
@@ -93,54 +250,29 @@ class Piano:
             # render 2 octaves by default
             self.noterange = NoteRange(SpecificNote('C', 0), SpecificNote('B', 1))
 
-        self.white_notes = tuple(note for note in self.noterange if note.abstract in WHITE_NOTES)
-        self.black_notes = tuple(note for note in self.noterange if note.abstract in BLACK_NOTES)
-        width = ww * len(self.white_notes) if self.black_small else ww * len(self.noterange)
-        self.size = width, wh
-        self.rects = []
-
-        notes = self.white_notes + self.black_notes if black_small else self.noterange
-        for note in notes:
-            x, w, h, c, sx, sy = self.coord_helper(note)
-
-            # draw key
-            if note_onclick := self.note_onclicks.get(note, self.note_onclicks.get(note.abstract)):
-                note_onclick = f' onclick="{note_onclick}"'
-            else:
-                note_onclick = ''
-
-            note_rect = f"""<rect class='note' note='{note}' x='{x}' y='0' width='{w}' height='{h}' style='fill:{colortool.css_hex(c)};stroke-width:1;stroke:{colortool.css_hex(BLACK_PALE)}'{note_onclick}/>"""  # noqa: E501
-            if note_href := self.note_hrefs.get(note, self.note_hrefs.get(note.abstract)):
-                note_rect = f"<a href='{note_href}'>{note_rect}</a>"
-            self.rects.append(note_rect)
-
-            # draw rectangle on top of note
-            if rect_color := self.top_rect_colors.get(note, self.top_rect_colors.get(note.abstract)):
-                self.rects.append(f"""<rect class='top_rect' note='{note}' x='{x}' y='0' width='{w}' height='{top_rect_height}' style='fill:{colortool.css_hex(rect_color)};'/>""")
-
-            # draw squares on notes
-            if payload := self.squares.get(note, self.squares.get(note.abstract)):
-                fill_color = colortool.css_hex(payload.get('fill_color', WHITE_BRIGHT))
-                border_color = colortool.css_hex(payload.get('border_color', BLACK_BRIGHT))
-
-                onclick = payload.get('onclick')
-                onclick = f" onclick='{onclick}'" if onclick else ''
-
-                rect = f"<rect class='square' note='{note}' x='{sx}' y='{sy}' width='{square_size}' height='{square_size}' style='fill:{fill_color};stroke-width:1;stroke:{border_color}'/>"
-
-                if text := payload.get('text'):
-                    text_color = colortool.css_hex(payload.get('text_color', BLACK_BRIGHT))
-                    text_size = payload.get('text_size', '15')
-                    rect += f"<text class='square' note='{note}' x='{sx}' y='{sy + square_size}' font-family=\"Menlo\" font-size='{text_size}' style='fill:{text_color}'>{text}</text>"
-
-                self.rects.append(f"""
-                    <g class='square' note='{note}'{onclick}>
-                        {rect}
-                    </g>
-                """)
-
-        # border around whole svg
-        self.rects.append(f"<rect x='0' y='0' width='{self.size[0] - 1}' height='{self.size[1] - 1}' style='fill:none;stroke-width:1;stroke:{colortool.css_hex(BLACK_PALE)}'/>")
+        layout_args = self.noterange, black_small, ww, wh, square_size
+        self.layout = layout(*layout_args)
+        self.white_notes = self.layout.white_notes
+        self.black_notes = self.layout.black_notes
+        self.size = self.layout.size
+        self._key: RenderKey = layout_args, top_rect_height, tuple(self._payload(note) for note in self.layout.notes)
+
+    def _payload(self, note: SpecificNote) -> KeyPayload:
+        """specific note overrides abstract note"""
+        abstract = note.abstract
+        square = self.squares.get(note, self.squares.get(abstract))
+        return (
+            self.note_colors.get(note, self.note_colors.get(abstract, note_color(note))),
+            self.note_hrefs.get(note, self.note_hrefs.get(abstract)),
+            self.note_onclicks.get(note, self.note_onclicks.get(abstract)),
+            self.top_rect_colors.get(note, self.top_rect_colors.get(abstract)),
+            tuple(sorted(square.items())) if square else None,
+        )
+
+    @property
+    def rects(self) -> tuple[str, ...]:
+        """svg elements of keys and border, read-only: rendering is cached and shared between equal pianos"""
+        return _render_rects(self._key)
 
     def coord_helper(self, note: SpecificNote) -> tuple[int, int, int, int, int, int]:
         """
@@ -155,27 +287,12 @@ class Piano:
         sx: x coordinate of square
         sy: x coordinate of square
         """
+        try:
+            x, w, h, sx, sy = self.layout.geometry[note]
+        except KeyError:
+            raise KeyError('unknown note')
         c = self.note_colors.get(note, self.note_colors.get(note.abstract, note_color(note)))
-
-        # def big_note():
-        #     ...
-        #
-        # def small(note):
-        #     ...
-
-        if self.black_small:
-            if note in self.white_notes:
-                x = self.ww * self.white_notes.index(note)
-                return x, self.ww, self.wh, c, (x + x + self.ww) // 2 - self.square_size // 2, self.wh - self.square_size - 5
-            elif note in self.black_notes:
-                x = self.ww * self.white_notes.index(note + 1) - self.bw // 2
-                sx = self.ww * self.white_notes.index(note + 1) - self.square_size // 2
-                return x, self.bw, self.bh, c, sx, self.bh - self.square_size - 3
-            else:
-                raise KeyError('unknown note')
-
-        x = self.ww * self.noterange.index(note)
-        return x, self.ww, self.wh, c, (x + x + self.ww) // 2 - self.square_size // 2, self.wh - self.square_size - 5
+        return x, w, h, c, sx, sy
 
     @staticmethod
     def pretty_print(svg: str) -> str:
@@ -184,10 +301,16 @@ class Piano:
         return ElementTree.tostring(tree, encoding='unicode')
 
     def _repr_svg_(self, pretty: bool = True) -> str:
-        rects = '\n'.join(self.rects)
-        svg = f"""
-        <svg width='{self.size[0]}' height='{self.size[1]}'>
-        {rects}
-        </svg>
+        """pretty=False is fast path: compact svg without reparsing"""
+        return _render_svg(self._key, pretty)
+
+    @property
+    def layout_args(self) -> LayoutArgs:
+        return self._key[0]
+
+    def svg_use(self, template_id: str) -> str:
+        """
+        compact svg which draws only keys with non-default payload
+        other keys are referenced from template_defs(self.layout_args, template_id) which should be somewhere in same document
         """
-        return Piano.pretty_print(svg) if pretty else svg
+        return _render_svg_use(self._key, template_id)
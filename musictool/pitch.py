@@ -1,7 +1,27 @@
+from __future__ import annotations
+
+import functools
 import math
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
 
 from musictool.note import SpecificNote
 
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.int_]
+N_MIDI_CODES = 128
+
+
+@functools.lru_cache(maxsize=64)
+def _midi_hz_table(hz_tuning: float, origin_i: int, transpose: float) -> FloatArray:
+    """computed with scalar formula, so lookups are bit-exact with Pitch.note_i_to_hz"""
+    pitch = Pitch(hz_tuning, SpecificNote.from_i(origin_i), transpose)
+    table = np.array([pitch.i_to_hz(i - origin_i) for i in range(N_MIDI_CODES)], dtype=np.float64)
+    table.flags.writeable = False
+    return table
+
 
 class Pitch:
     def __init__(
@@ -42,3 +62,42 @@ class Pitch:
         """Convert pixel position to hz (assuming pixel using logarithmic scale)"""
         c = px / px_max
         return hz_min ** (1 - c) * hz_max ** c  # type: ignore
+
+    # vectorized versions: accept anything convertible to numpy array and return array of same shape
+
+    @property
+    def midi_hz(self) -> FloatArray:
+        """read-only lookup table MIDI code -> hz, shared between all Pitch objects with same tuning"""
+        return _midi_hz_table(self.hz_tuning, self.origin_note.i, self.transpose)
+
+    def i_to_hz_array(self, i: npt.ArrayLike) -> FloatArray:
+        return self.hz_tuning * np.exp2((np.asarray(i, dtype=np.float64) + self.transpose) / 12)
+
+    def hz_to_i_array(self, hz: npt.ArrayLike) -> FloatArray:
+        return 12 * np.log2(np.asarray(hz, dtype=np.float64) / self.hz_tuning) - self.transpose
+
+    def note_i_to_hz_array(self, note_i: npt.ArrayLike) -> FloatArray:
+        """integer MIDI codes are looked up in midi_hz table, other input is computed"""
+        note_i = np.asarray(note_i)
+        if note_i.dtype.kind in 'iu' and (note_i.size == 0 or (note_i.min() >= 0 and note_i.max() < N_MIDI_CODES)):
+            return self.midi_hz[note_i]  # type: ignore[no-any-return]
+        return self.i_to_hz_array(note_i - self.origin_note.i)
+
+    def hz_to_note_i_array(self, hz: npt.ArrayLike) -> FloatArray:
+        return self.origin_note.i + self.hz_to_i_array(hz)
+
+    def notes_to_hz(self, notes: Iterable[SpecificNote]) -> FloatArray:
+        return self.note_i_to_hz_array(np.fromiter((note.i for note in notes), dtype=np.int_))
+
+    def hz_to_note_codes(self, hz: npt.ArrayLike) -> IntArray:
+        """array version of hz_to_note, returns MIDI codes instead of SpecificNote objects"""
+        return self.hz_to_note_i_array(hz).astype(np.int_)  # truncates like int() in hz_to_note
+
+    @staticmethod
+    def hz_to_px_array(hz: npt.ArrayLike, hz_min: float, hz_max: float, px_max: float) -> FloatArray:
+        return np.log2(np.asarray(hz, dtype=np.float64) / hz_min) / math.log2(hz_max / hz_min) * px_max
+
+    @staticmethod
+    def px_to_hz_array(px: npt.ArrayLike, hz_min: float, hz_max: float, px_max: float) -> FloatArray:
+        c = np.asarray(px, dtype=np.float64) / px_max
+        return hz_min ** (1 - c) * hz_max ** c
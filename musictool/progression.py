@@ -8,14 +8,20 @@ from collections.abc import Iterator
 from collections.abc import Sequence
 from typing import overload
 
+import numpy as np
+import numpy.typing as npt
+
 from musictool.chord import SpecificChord
 from musictool.note import SpecificNote
 from musictool.util.cache import Cached
+from musictool.util.cache import LRUCache
 
 CheckCallable = Callable[[SpecificChord, SpecificChord], bool]
 
 
 class Progression(Cached, Sequence[SpecificChord]):
+    _cache_factory = LRUCache
+
     def __init__(self, chords: tuple[SpecificChord, ...], /):
         if not all(isinstance(x, SpecificChord) for x in chords):
             raise TypeError('only SpecificChord items allowed')
@@ -69,6 +75,13 @@ class Progression(Cached, Sequence[SpecificChord]):
             return origin.abstract.i, key
         return key
 
+    def transpose_key(self) -> bytes:
+        """
+        compact equivalent of transpose_unique_key(origin_name=False)
+        progressions which are transpositions of each other have same key
+        """
+        return transpose_key(tuple(note.i for note in chord) for chord in self)
+
     def __add__(self, other: int) -> Progression:
         if not isinstance(other, int):
             raise TypeError('only adding integers is allowed (transposition)')
@@ -80,3 +93,70 @@ class Progression(Cached, Sequence[SpecificChord]):
 
     def __getnewargs__(self) -> tuple[tuple[SpecificChord, ...]]:
         return self.chords,
+
+
+def transpose_key(chords: Iterable[Sequence[int]]) -> bytes:
+    """
+    packs progression given as MIDI codes of each chord (ascending) into bytes:
+    n_notes of each chord followed by offsets of all notes from lowest note of first chord (shifted by 128 to fit a byte)
+    """
+    lengths = bytearray()
+    offsets = bytearray()
+    origin = None
+    for chord in chords:
+        if origin is None:
+            origin = chord[0] - 128
+        lengths.append(len(chord))
+        offsets.extend(code - origin for code in chord)
+    return bytes(lengths + offsets)
+
+
+def transpose_keys(codes: npt.NDArray[np.int_]) -> list[bytes]:
+    """
+    vectorized transpose_key for array of progressions of shape (n_progressions, n_chords, n_voices)
+    voices should be sorted ascending
+    """
+    n, n_chords, n_voices = codes.shape
+    lengths = bytes([n_voices] * n_chords)
+    offsets = (codes - codes[:, :1, :1] + 128).astype(np.uint8).reshape(n, -1)
+    return [lengths + row.tobytes() for row in offsets]
+
+
+class TransposeIndex:
+    """
+    counts progressions per transposition class
+    accepts Progression objects or raw MIDI codes, so generated progressions can be deduplicated without building objects
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[bytes, int] = {}
+
+    def add_key(self, key: bytes) -> bool:
+        """returns True if key is seen for the first time"""
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count == 0
+
+    def add(self, progression: Progression) -> bool:
+        return self.add_key(progression.transpose_key())
+
+    def add_codes(self, chords: Iterable[Sequence[int]]) -> bool:
+        return self.add_key(transpose_key(chords))
+
+    def add_array(self, codes: npt.NDArray[np.int_]) -> npt.NDArray[np.bool_]:
+        """returns mask of progressions seen for the first time"""
+        return np.array([self.add_key(key) for key in transpose_keys(codes)], dtype=bool)
+
+    def unique(self, progressions: Iterable[Progression]) -> Iterator[Progression]:
+        """streams first progression of each transposition class"""
+        for progression in progressions:
+            if self.add(progression):
+                yield progression
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: object) -> bool:
+        if isinstance(item, Progression):
+            return item.transpose_key() in self.counts
+        return item in self.counts
@@ -4,15 +4,20 @@ import functools
 import itertools
 import random
 import statistics
+from pathlib import Path
 
-import pipe21 as P
+import numpy as np
+import numpy.typing as npt
 
 from musictool import config
+from musictool.util.array_store import ArrayStore
 from musictool.util.cache import Cached
-from musictool.util.sequence_builder import SequenceBuilder
+from musictool.util.cache import WeakValueCache
 
 
 class Rhythm(Cached):
+    _cache_factory = WeakValueCache
+
     def __init__(
         self,
         notes: tuple[int, ...],
@@ -61,26 +66,176 @@ class Rhythm(Cached):
         spacings = [len(list(g)) for k, g in itertools.groupby(x, key=bool) if not k]
         if len(spacings) == 1:  # TODO: try normalize into 0..1
             return float('inf')
-        return statistics.variance(spacings)
+        return float(statistics.variance(spacings))
+
+    @functools.cached_property
+    def mask(self) -> int:
+        """notes as integer, first note is most significant bit"""
+        return int(self.bits, base=2)
 
     @staticmethod
-    def all_rhythms(n_notes: int | None = None, bar_notes: int = 16, sort_by_score: bool = False) -> tuple[Rhythm, ...]:
-        rhythms__ = SequenceBuilder(
-            n=bar_notes,
-            options=(0, 1),
-            curr_prev_constraint={-1: Rhythm.no_contiguous_ones},
-        )
+    def all_rhythms(
+        n_notes: int | None = None,
+        bar_notes: int = 16,
+        sort_by_score: bool = False,
+        loop: bool = False,
+    ) -> tuple[Rhythm, ...]:
+        """
+        rhythms without contiguous ones, in lexicographic order of notes (or sorted by (score, notes))
+        :param loop: also exclude rhythms where both first and last notes are played
+        """
+        masks = rhythm_masks(bar_notes, n_notes, loop)
+        scores = masks_score(masks, bar_notes)
+        if sort_by_score:
+            order = np.lexsort((masks, scores))
+            masks, scores = masks[order], scores[order]
+        return masks_to_rhythms(masks, scores, bar_notes)
 
-        if n_notes is not None:
-            rhythms_ = rhythms__ | P.Filter(lambda r: sum(r) == n_notes)
 
-        rhythms = (Rhythm(r, bar_notes=bar_notes) for r in rhythms_)
+MAX_BAR_NOTES = 64
+_ONE = np.uint64(1)
 
-        if sort_by_score:
-            rhythms = (
-                rhythms
-                | P.KeyBy(lambda rhythm: rhythm.score)
-                | P.Pipe(lambda x: sorted(x, key=lambda score_rhythm: (score_rhythm[0], score_rhythm[1].notes)))
-            )
-        out: tuple[Rhythm] = rhythms | P.Pipe(tuple)
-        return out
+
+def rhythm_masks(bar_notes: int, n_notes: int | None = None, loop: bool = False) -> npt.NDArray[np.uint64]:
+    """
+    sorted masks of all rhythms without contiguous ones (x & (x << 1) == 0)
+    masks are built directly instead of filtering all 2 ** bar_notes integers:
+    valid masks of length L are (valid of length L - 1) << 1 and (valid of length L - 2) << 2 | 1,
+    masks are grouped by number of ones, so only groups up to n_notes are ever built
+    """
+    if not 0 < bar_notes <= MAX_BAR_NOTES:
+        raise ValueError(f'bar_notes should be in range 1..{MAX_BAR_NOTES}')
+    if n_notes is not None and n_notes < 0:
+        raise ValueError('n_notes should be non-negative')
+    max_ones = (bar_notes + 1) // 2 if n_notes is None else n_notes
+    empty = np.empty(0, dtype=np.uint64)
+    # by_ones[j] are masks of current length with j ones
+    prev = [np.zeros(1, dtype=np.uint64)] + [empty] * max_ones  # length 0
+    curr = [np.zeros(1, dtype=np.uint64), np.ones(1, dtype=np.uint64)][:max_ones + 1] + [empty] * (max_ones - 1)  # length 1
+    for _ in range(bar_notes - 1):
+        prev, curr = curr, [
+            np.concatenate((curr[j] << _ONE, (prev[j - 1] << np.uint64(2)) | _ONE if j else empty))
+            for j in range(max_ones + 1)
+        ]
+    masks = np.concatenate(curr) if n_notes is None else curr[n_notes]
+    if loop:
+        masks = masks[(masks >> np.uint64(bar_notes - 1)) & masks & _ONE == 0]
+    return np.sort(masks)
+
+
+def masks_to_notes(masks: npt.NDArray[np.uint64], bar_notes: int) -> npt.NDArray[np.uint8]:
+    """(N,) masks to (N, bar_notes) array of 0 and 1"""
+    shifts = np.arange(bar_notes - 1, -1, -1, dtype=np.uint64)
+    return ((masks[:, np.newaxis] >> shifts) & _ONE).astype(np.uint8)  # type: ignore[no-any-return]
+
+
+def masks_to_rhythms(masks: npt.NDArray[np.uint64], scores: npt.NDArray[np.float64], bar_notes: int) -> tuple[Rhythm, ...]:
+    out = []
+    for notes, score in zip(map(tuple, masks_to_notes(masks, bar_notes).tolist()), scores.tolist()):
+        rhythm = Rhythm(notes, bar_notes=bar_notes)
+        rhythm.__dict__.setdefault('score', score)  # prefill cached_property
+        out.append(rhythm)
+    return tuple(out)
+
+
+def masks_score(masks: npt.NDArray[np.uint64], bar_notes: int) -> npt.NDArray[np.float64]:
+    """
+    vectorized Rhythm.score: sample variance of non-empty spacings between played notes (cyclic)
+    computed from integer sums, so result is same float as statistics.variance
+    """
+    notes = masks_to_notes(masks, bar_notes)
+    n_ones = notes.sum(axis=1)
+    out = np.full(len(masks), np.inf)
+    for k in np.unique(n_ones).tolist():
+        if k < 2:
+            continue
+        rows = np.flatnonzero(n_ones == k)
+        positions = np.nonzero(notes[rows])[1].reshape(len(rows), k)
+        spacings = np.diff(positions, axis=1, append=positions[:, :1] + bar_notes) - 1
+        m = (spacings > 0).sum(axis=1)
+        s1 = spacings.sum(axis=1)
+        s2 = (spacings * spacings).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[rows] = np.where(m > 1, (m * s2 - s1 * s1) / (m * (m - 1)), np.inf)
+    return out
+
+
+def canonical_masks(masks: npt.NDArray[np.uint64], bar_notes: int) -> npt.NDArray[np.uint64]:
+    """smallest rotation of each mask, rotations of same rhythm (necklace) have same canonical mask"""
+    full = np.uint64((1 << bar_notes) - 1)
+    shift_back = np.uint64(bar_notes - 1)
+    best = masks.copy()
+    rotated = masks.copy()
+    for _ in range(bar_notes - 1):
+        rotated = ((rotated << _ONE) | (rotated >> shift_back)) & full
+        np.minimum(best, rotated, out=best)
+    return best  # type: ignore[no-any-return]
+
+
+class RhythmCatalogue(ArrayStore):
+    """
+    rhythm necklaces with bar_notes notes and n_notes played notes:
+    all rotations of rhythm without contiguous ones (including wraparound) are represented by one canonical rotation
+    necklaces are sorted by (score, mask), so best rhythms are first and score range queries are binary searches
+    """
+    ARRAYS = 'masks', 'scores', 'n_rotations'
+
+    def __init__(
+        self,
+        bar_notes: int,
+        n_notes: int,
+        masks: npt.NDArray[np.uint64],
+        scores: npt.NDArray[np.float64],
+        n_rotations: npt.NDArray[np.int32],
+    ):
+        self.bar_notes = bar_notes
+        self.n_notes = n_notes
+        self.masks = masks
+        self.scores = scores
+        self.n_rotations = n_rotations  # number of distinct rhythms represented by each necklace
+
+    @classmethod
+    def build(cls, bar_notes: int, n_notes: int) -> RhythmCatalogue:
+        canonical = canonical_masks(rhythm_masks(bar_notes, n_notes, loop=True), bar_notes)
+        masks, n_rotations = np.unique(canonical, return_counts=True)
+        scores = masks_score(masks, bar_notes)
+        order = np.lexsort((masks, scores))
+        return cls(bar_notes, n_notes, masks[order], scores[order], n_rotations[order].astype(np.int32))
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def rhythms(self, start: int = 0, stop: int | None = None) -> tuple[Rhythm, ...]:
+        return masks_to_rhythms(self.masks[start:stop], self.scores[start:stop], self.bar_notes)
+
+    def best(self, k: int) -> tuple[Rhythm, ...]:
+        """k rhythms with lowest score"""
+        return self.rhythms(0, k)
+
+    def score_range(self, min_score: float = -np.inf, max_score: float = np.inf) -> tuple[int, int]:
+        """start and stop positions of necklaces with min_score <= score <= max_score"""
+        start = np.searchsorted(self.scores, min_score, side='left')
+        stop = np.searchsorted(self.scores, max_score, side='right')
+        return int(start), int(stop)
+
+    def between(self, min_score: float = -np.inf, max_score: float = np.inf) -> tuple[Rhythm, ...]:
+        return self.rhythms(*self.score_range(min_score, max_score))
+
+    def index(self, rhythm: Rhythm) -> int:
+        """position of necklace of rhythm (rhythm can be any rotation)"""
+        if rhythm.bar_notes != self.bar_notes or sum(rhythm.notes) != self.n_notes:
+            raise KeyError(f'{rhythm} is not in catalogue')
+        mask = canonical_masks(np.array([rhythm.mask], dtype=np.uint64), self.bar_notes)[0]
+        start, stop = self.score_range(rhythm.score, rhythm.score)
+        i = start + int(np.searchsorted(self.masks[start:stop], mask))
+        if i == stop or self.masks[i] != mask:
+            raise KeyError(f'{rhythm} is not in catalogue')
+        return i
+
+    def meta(self) -> dict[str, int]:
+        return {'bar_notes': self.bar_notes, 'n_notes': self.n_notes}
+
+    @classmethod
+    def load_or_build(cls, directory: str | Path, bar_notes: int, n_notes: int) -> RhythmCatalogue:
+        """catalogue is built once and saved to subdirectory of directory, next calls memory-map it"""
+        return cls._load_or_build(Path(directory) / f'{bar_notes}_{n_notes}', lambda: cls.build(bar_notes, n_notes))
@@ -2,20 +2,29 @@ from __future__ import annotations
 
 import functools
 import itertools
+import pickle
 from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
 
 import colortool
+import numpy as np
+import numpy.typing as npt
 
 from musictool import config
 from musictool.card import Card
+from musictool.card import CardData
 from musictool.chord import Chord
 from musictool.config import BLACK_BRIGHT
 from musictool.config import BLUE
 from musictool.config import GREEN
 from musictool.config import RED
 from musictool.note import Note
+from musictool.noteset import CHROMATIC_MASK
 from musictool.noteset import NoteSet
+from musictool.noteset import mask_to_notes
 from musictool.piano import Piano
+from musictool.util.lazy import LazyMapping
 
 
 class Scale(NoteSet, Card):
@@ -107,29 +116,29 @@ class Scale(NoteSet, Card):
                 return Scale.from_name(note, name)
         raise KeyError(f'relative {relative_name} scale not found')
 
-    def to_piano_image(self) -> str:
-        return Piano(note_colors={note: config.scale_colors[scale] for note, scale in self.note_scales.items()})._repr_svg_()
+    def to_piano(self) -> Piano:
+        return Piano(note_colors={note: config.scale_colors[scale] for note, scale in self.note_scales.items()})
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = (),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
+    ) -> CardData:
         html_classes += self.name,
 
         if C_name := self.note_scales.get(Note('C'), ''):
             C_name = f' | C {C_name}'
 
-        return self.repr_card(
+        return CardData(
             html_classes=html_classes,
             title=title or f'{self.root.name} {self.name}{C_name}',
             subtitle=subtitle,
             header_href=header_href or self.root.name,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
 
 # flake8: noqa
@@ -143,16 +152,33 @@ class ComparedScales(Card):
     """
 
     def __init__(self, left: Scale, right: Scale):
+        """only masks are computed here, notes and triads are computed on first access (e.g. when rendering)"""
         self.left = left
         self.right = right
         self.key = left, right
-        self.shared_notes = frozenset(left.notes) & frozenset(right.notes)
-        self.new_notes = frozenset(right.notes) - frozenset(left.notes)
-        self.del_notes = frozenset(left.notes) - frozenset(right.notes)
-        if right.kind == 'diatonic':
-            self.shared_triads = frozenset(left.triads) & frozenset(right.triads)
+        self.shared_mask = left.mask & right.mask
+        self.new_mask = right.mask & ~left.mask
+        self.del_mask = left.mask & ~right.mask
 
-    def to_piano_image(self) -> str:
+    @functools.cached_property
+    def shared_notes(self) -> frozenset[Note]:
+        return mask_to_notes(self.shared_mask)
+
+    @functools.cached_property
+    def new_notes(self) -> frozenset[Note]:
+        return mask_to_notes(self.new_mask)
+
+    @functools.cached_property
+    def del_notes(self) -> frozenset[Note]:
+        return mask_to_notes(self.del_mask)
+
+    @functools.cached_property
+    def shared_triads(self) -> frozenset[Chord]:
+        if self.right.kind != 'diatonic':
+            raise AttributeError('shared_triads are defined only for diatonic scales')
+        return frozenset(self.left.triads) & frozenset(self.right.triads)
+
+    def to_piano(self) -> Piano:
         return Piano(
             note_colors={note: config.scale_colors[scale] for note, scale in self.right.note_scales.items()},
             top_rect_colors=dict.fromkeys(self.del_notes, RED) | dict.fromkeys(self.new_notes, GREEN) | dict.fromkeys(self.shared_notes, BLUE),  # type: ignore
@@ -166,29 +192,29 @@ class ComparedScales(Card):
                 }
                 for chord in self.right.triads
             } if self.right.kind == 'diatonic' else {},
-        )._repr_svg_()
+        )
 
-    def _repr_html_(
+    def card_data(
         self,
         html_classes: tuple[str, ...] = ('card',),
         title: str | None = None,
         subtitle: str | None = None,
         header_href: str | None = None,
         background_color: str | None = None,
-    ) -> str:
+    ) -> CardData:
 
         if left_root_name := self.right.note_scales.get(self.left.root, ''):
             if background_color is None:
                 background_color = colortool.css_hex(config.scale_colors[left_root_name])
             left_root_name = f' | {self.left.root.name} {left_root_name}'
 
-        return self.repr_card(
+        return CardData(
             html_classes=html_classes,
             title=title or f'{self.right.root.name} {self.right.name}{left_root_name}',
             subtitle=subtitle,
             header_href=header_href or self.right.root.name,
             background_color=background_color,
-            piano_html=self.to_piano_image(),
+            piano=self.to_piano(),
         )
 
     def __eq__(self, other: object) -> bool:
@@ -203,11 +229,20 @@ class ComparedScales(Card):
         return f'ComparedScale({self.left.root} {self.left.name} | {self.right.root} {self.right.name})'
 
 
-diatonic = {(root, name): Scale.from_name(root, name) for root, name in itertools.product(config.chromatic_notes, config.diatonic)}
-harmonic = {(root, name): Scale.from_name(root, name) for root, name in itertools.product(config.chromatic_notes, config.harmonic)}
-melodic = {(root, name): Scale.from_name(root, name) for root, name in itertools.product(config.chromatic_notes, config.melodic)}
-pentatonic = {(root, name): Scale.from_name(root, name) for root, name in itertools.product(config.chromatic_notes, config.pentatonic)}
-sudu = {(root, name): Scale.from_name(root, name) for root, name in itertools.product(config.chromatic_notes, config.sudu)}
+def _scale_from_key(key: tuple[str, str]) -> Scale:
+    return Scale.from_name(*key)
+
+
+def _scales_of_kind(kind: str) -> LazyMapping[tuple[str, str], Scale]:
+    return LazyMapping(itertools.product(config.chromatic_notes, getattr(config, kind)), _scale_from_key)
+
+
+# scales are built on first access
+diatonic = _scales_of_kind('diatonic')
+harmonic = _scales_of_kind('harmonic')
+melodic = _scales_of_kind('melodic')
+pentatonic = _scales_of_kind('pentatonic')
+sudu = _scales_of_kind('sudu')
 all_scales = {
     'diatonic': diatonic,
     'harmonic': harmonic,
@@ -217,23 +252,77 @@ all_scales = {
 }
 
 CIRCLE_OF_FIFTHS_CLOCKWISE = 'CGDAEBfdaebF'
+MAJOR_NAMES = {'diatonic': 'major', 'harmonic': 'h_major', 'melodic': 'm_major', 'pentatonic': 'p_major', 'sudu': 's_major'}
+
+
+def _majors_of_kind(kind: str) -> tuple[Scale, ...]:
+    return tuple(all_scales[kind][note, MAJOR_NAMES[kind]] for note in CIRCLE_OF_FIFTHS_CLOCKWISE)
+
 
 # circle of fifths clockwise
-majors = dict(
-    diatonic=tuple(diatonic[note, 'major'] for note in CIRCLE_OF_FIFTHS_CLOCKWISE),
-    harmonic=tuple(harmonic[note, 'h_major'] for note in CIRCLE_OF_FIFTHS_CLOCKWISE),
-    melodic=tuple(melodic[note, 'm_major'] for note in CIRCLE_OF_FIFTHS_CLOCKWISE),
-    pentatonic=tuple(pentatonic[note, 'p_major'] for note in CIRCLE_OF_FIFTHS_CLOCKWISE),
-    sudu=tuple(sudu[note, 's_major'] for note in CIRCLE_OF_FIFTHS_CLOCKWISE),
-)
+majors = LazyMapping(all_scales, _majors_of_kind)
+
+
+def save_snapshot(path: str | Path) -> None:
+    """pickle all scales of all kinds, use load_snapshot to restore them without rebuilding"""
+    snapshot = {kind: dict(scales) for kind, scales in all_scales.items()}
+    with open(path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_snapshot(path: str | Path) -> None:
+    with open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+    for kind, scales in snapshot.items():
+        all_scales[kind].preload(scales)
+
+
+_POPCOUNT = np.array([mask.bit_count() for mask in range(CHROMATIC_MASK + 1)], dtype=np.int8)
+
+
+class NeighborTable:
+    """
+    neighbor relation of all scales of one kind
+    shared[i, j] is number of notes shared by scales[i] and scales[j], computed with popcount of masks intersection
+    """
+
+    def __init__(self, scales: Iterable[Scale]):
+        self.scales = tuple(scales)
+        self.index = {scale: i for i, scale in enumerate(self.scales)}
+        self.masks = np.array([scale.mask for scale in self.scales], dtype=np.uint16)
+        self.shared = _POPCOUNT[self.masks[:, np.newaxis] & self.masks[np.newaxis, :]]
+        self.shared.flags.writeable = False
+
+    @classmethod
+    def from_kind(cls, kind: str) -> NeighborTable:
+        return cls(all_scales[kind].values())
+
+    def __len__(self) -> int:
+        return len(self.scales)
+
+    def counts(self, scale: Scale) -> npt.NDArray[np.int8]:
+        """number of shared notes with every scale of kind, in order of self.scales"""
+        return self.shared[self.index[scale]]  # type: ignore[no-any-return]
+
+    def sharing_ids(self, scale: Scale, min_shared: int) -> npt.NDArray[np.intp]:
+        return np.flatnonzero(self.shared[self.index[scale]] >= min_shared)
+
+    def sharing(self, scale: Scale, min_shared: int) -> tuple[Scale, ...]:
+        """scales which share at least min_shared notes with scale (including scale itself)"""
+        return tuple(self.scales[i] for i in self.sharing_ids(scale, min_shared))
+
+    def compared(self, scale: Scale) -> dict[int, list[ComparedScales]]:
+        """ComparedScales grouped by number of shared notes"""
+        out: defaultdict[int, list[ComparedScales]] = defaultdict(list)
+        for right, n_shared in zip(self.scales, self.counts(scale).tolist(), strict=True):
+            out[n_shared].append(ComparedScales(scale, right))
+        return out
+
+
+# one table per kind, built on first access
+neighbor_tables = LazyMapping(all_scales, NeighborTable.from_kind)
 
 
 @functools.cache
 def neighbors(left: Scale) -> dict[int, list[ComparedScales]]:
-    neighs = defaultdict(list)
-    for right_ in all_scales[left.kind].values():
-        # if left == right:
-        #     continue
-        right = ComparedScales(left, right_)
-        neighs[len(right.shared_notes)].append(right)
-    return neighs
+    return neighbor_tables[left.kind].compared(left)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from typing import ClassVar
+from typing import Literal
+from typing import TypeVar
+
+import numpy as np
+
+Self = TypeVar('Self', bound='ArrayStore')
+
+META = 'meta.json'
+
+
+class ArrayStore:
+    """
+    base for objects which consist of numpy arrays (attributes named in ARRAYS) and small json metadata
+    saved directory has one .npy file per array and meta.json, arrays can be memory-mapped by many processes
+    object is reconstructed as cls(**meta, **arrays)
+    """
+    ARRAYS: ClassVar[tuple[str, ...]]
+
+    def meta(self) -> dict[str, Any]:
+        """json-serializable constructor arguments which are not arrays"""
+        return {}
+
+    def save(self, path: str | Path) -> None:
+        """meta.json is written last, so directory with it is complete"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(path / f'{name}.npy', getattr(self, name))
+        (path / META).write_text(json.dumps(self.meta()))
+
+    @classmethod
+    def load(cls: type[Self], path: str | Path, mmap: bool = True) -> Self:
+        path = Path(path)
+        meta = json.loads((path / META).read_text())
+        mmap_mode: Literal['r'] | None = 'r' if mmap else None
+        return cls(**meta, **{name: np.load(path / f'{name}.npy', mmap_mode=mmap_mode) for name in cls.ARRAYS})
+
+    @classmethod
+    def _load_or_build(cls: type[Self], path: str | Path, build: Callable[[], Self]) -> Self:
+        """
+        object is built once and saved to path, next calls memory-map it
+        saving goes to temporary directory which is then renamed, so concurrent processes never see partial directory
+        """
+        path = Path(path)
+        if (path / META).exists():
+            return cls.load(path)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        build().save(tmp_path)
+        try:
+            tmp_path.rename(path)
+        except OSError:  # other process already saved same object
+            shutil.rmtree(tmp_path)
+        return cls.load(path)
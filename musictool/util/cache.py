@@ -1,15 +1,189 @@
+from __future__ import annotations
+
+import abc
+import copyreg
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
 from collections.abc import Hashable
+from collections.abc import MutableMapping
 from typing import Any
+from typing import ClassVar
+from typing import NamedTuple
 
+CacheKey = Hashable
+_NO_KWARGS: frozenset[tuple[str, Hashable]] = frozenset()
 
-class Cached:
-    _cache: dict[tuple[type, tuple[Hashable, ...], frozenset[tuple[str, Hashable]]], Any] = {}
 
-    def __new__(cls, *args: Hashable, **kwargs: Hashable) -> Any:
-        key = cls, args, frozenset(kwargs.items())
-        instance = cls._cache.get(key)
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+class Cache(abc.ABC):
+    """
+    storage for interned instances of Cached subclasses
+    each Cached subclass owns separate Cache instance
+    """
+    maxsize: int | None = None
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._data: MutableMapping[CacheKey, Any] = self._make_data()
+
+    @abc.abstractmethod
+    def _make_data(self) -> MutableMapping[CacheKey, Any]:
+        ...
+
+    def get(self, key: CacheKey) -> Any:
+        instance = self._data.get(key)
+        if instance is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return instance
+
+    def set(self, key: CacheKey, instance: Any) -> None:
+        self._data[key] = instance
+
+    def setdefault(self, key: CacheKey, instance: Any) -> Any:
+        """returns instance stored under key, stores given instance if there is none, not counted as hit or miss"""
+        stored = self._data.get(key)
+        if stored is not None:
+            return stored
+        self.set(key, instance)
+        return instance
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}{tuple(self.info())}'
+
+
+class UnboundedCache(Cache):
+    """never evicts, use for small closed families of objects (e.g. Note)"""
+
+    def _make_data(self) -> dict[CacheKey, Any]:
+        return {}
+
+
+class LRUCache(Cache):
+    """keeps at most maxsize most recently used instances"""
+
+    _data: OrderedDict[CacheKey, Any]
+
+    def __init__(self, maxsize: int = 2 ** 16) -> None:
+        if maxsize <= 0:
+            raise ValueError('maxsize should be positive')
+        self.maxsize = maxsize
+        super().__init__()
+
+    def _make_data(self) -> OrderedDict[CacheKey, Any]:
+        return OrderedDict()
+
+    def get(self, key: CacheKey) -> Any:
+        instance = super().get(key)
         if instance is not None:
-            return instance
-        instance = super().__new__(cls)
-        cls._cache[key] = instance
+            self._data.move_to_end(key)
+        return instance
+
+    def set(self, key: CacheKey, instance: Any) -> None:
+        self._data[key] = instance
+        if len(self._data) > self.maxsize:  # type: ignore[operator]
+            self._data.popitem(last=False)
+
+
+class WeakValueCache(Cache):
+    """
+    keeps instances only while they are referenced somewhere else
+    interning (`a is b`) is guaranteed for all alive instances
+    """
+
+    def _make_data(self) -> weakref.WeakValueDictionary[CacheKey, Any]:
+        return weakref.WeakValueDictionary()
+
+
+class CachedMeta(abc.ABCMeta):
+    """
+    interning is done in type.__call__ instead of __new__:
+    on cache hit instance is returned as is, __new__ and __init__ run only for new instances
+    instance is cached only after __init__ succeeds
+    derived from ABCMeta so Cached can be mixed with abstract classes (Card, Sequence)
+    """
+    _cache: Cache
+    _cache_key: Callable[..., CacheKey]
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        key = cls._cache_key(*args, **kwargs)
+        instance = cls._cache.get(key)
+        if instance is None:
+            instance = super().__call__(*args, **kwargs)
+            cls._cache.set(key, instance)
         return instance
+
+
+def _restore(cls: type[Cached], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Cached:
+    """
+    unpickling: returns interned instance or registers blank one, __init__ is not called
+    pickle restores state of returned instance afterwards
+    """
+    return cls._cache.setdefault(cls._cache_key(*args, **kwargs), cls.__new__(cls))  # type: ignore[no-any-return]
+
+
+class Cached(metaclass=CachedMeta):
+    """
+    interns instances: constructing object with same arguments returns same instance
+    cache policy is set per class by overriding _cache_factory, subclasses inherit the policy but not the cache itself
+    subclasses can override _cache_key to normalize arguments into compact key
+    """
+    __slots__ = ()
+    _cache_factory: ClassVar[Callable[[], Cache]] = UnboundedCache
+    _cache: ClassVar[Cache] = UnboundedCache()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._cache = cls._cache_factory()
+
+    @classmethod
+    def _cache_key(cls, *args: Hashable, **kwargs: Hashable) -> CacheKey:
+        return args, frozenset(kwargs.items()) if kwargs else _NO_KWARGS
+
+    def __reduce_ex__(self, protocol: Any) -> str | tuple[Any, ...]:
+        """
+        default reduce (state is pickled as is), but object is created by _restore instead of __new__,
+        so unpickled object is interned instance, classes without __getnewargs__/__getnewargs_ex__ are not interned
+        """
+        reduced = super().__reduce_ex__(protocol)
+        if isinstance(reduced, str) or reduced[0] not in {copyreg.__newobj__, copyreg.__newobj_ex__}:  # type: ignore[attr-defined]
+            return reduced
+        if not hasattr(self, '__getnewargs_ex__') and not hasattr(self, '__getnewargs__'):
+            return reduced
+        func, args, *rest = reduced
+        if func is copyreg.__newobj__:  # type: ignore[attr-defined]
+            args = args[0], args[1:], {}
+        return _restore, args, *rest
+
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
+        return cls._cache.info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        cls._cache.clear()
+
+    @classmethod
+    def set_cache(cls, cache: Cache) -> None:
+        """replace cache of this class (e.g. to change LRU maxsize), previously interned instances are dropped"""
+        cls._cache = cache
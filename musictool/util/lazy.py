@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from typing import TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LazyMapping(Mapping[K, V]):
+    """
+    read-only mapping with fixed set of keys
+    values are computed by factory on first access and then stored
+    """
+
+    def __init__(self, keys: Iterable[K], factory: Callable[[K], V]):
+        self._keys = tuple(keys)
+        self._keys_set = frozenset(self._keys)
+        self._factory = factory
+        self._values: dict[K, V] = {}
+
+    def __getitem__(self, key: K) -> V:
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        if key not in self._keys_set:
+            raise KeyError(key)
+        value = self._factory(key)
+        self._values[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys_set
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(n_keys={len(self)}, n_computed={self.n_computed})'
+
+    @property
+    def n_computed(self) -> int:
+        return len(self._values)
+
+    def preload(self, values: Mapping[K, V]) -> None:
+        """store already computed values (e.g. loaded from disk), factory won't be called for these keys"""
+        if not values.keys() <= self._keys_set:
+            raise KeyError('unknown keys')
+        self._values.update(values)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import atexit
 import itertools
+import os
 import pickle
+import tempfile
+import uuid
+from collections import OrderedDict
 from collections.abc import Callable
 from collections.abc import Generator
 from collections.abc import Iterable
 from collections.abc import Sequence
 from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from functools import partial
+from pathlib import Path
 from typing import Any
 from typing import TypeVar
 
@@ -37,7 +44,16 @@ class SequenceBuilder:
         loop: bool = False,
         prefix: tuple[Op, ...] = (),
         parallel: bool = False,
+        precompute_adjacency: bool = False,
+        memoize_dead_states: bool = False,
     ):
+        """
+        :param precompute_adjacency: evaluate curr_prev_constraint for all pairs of options once,
+            search then uses set lookups instead of calling constraints at every node. Requires options
+        :param memoize_dead_states: remember states (depth, last ops looked back by constraints) which have no valid completion
+            and skip them when reached again. Not supported with candidate_constraint and unique_key
+            because they depend on the whole prefix
+        """
         if parallel:
             try:
                 pickle.dumps(options)
@@ -88,6 +104,24 @@ class SequenceBuilder:
         self.prefix = prefix
         self.parallel = parallel
 
+        self.adjacency: dict[int, dict[Any, frozenset[Any]]] | None = None
+        if precompute_adjacency:
+            if self.options is None:
+                raise TypeError('precompute_adjacency requires options')
+            self.adjacency = {
+                k: {prev: frozenset(curr for curr in self.options if f(prev, curr)) for prev in self.options}
+                for k, f in (curr_prev_constraint or {}).items()
+            }
+
+        self.dead_states: set[tuple[int, tuple[Any, ...], tuple[Any, ...]]] | None = None
+        if memoize_dead_states:
+            if candidate_constraint is not None or unique_key is not None:
+                raise TypeError('memoize_dead_states is not supported with candidate_constraint and unique_key')
+            self.dead_states = set()
+            self.lookback = max((abs(k) for k in curr_prev_constraint or {}), default=0)
+            if options_callable is not None:
+                self.lookback = max(self.lookback, 1)
+
     def _generate_options_iterable(self, seq: tuple[Op, ...]) -> Iterable[Op]:
         if self.options is not None:
             return self.options
@@ -106,15 +140,14 @@ class SequenceBuilder:
     def __iter__(self) -> Generator[tuple[Op, ...], None, None]:
         return self._iter(self.prefix)
 
-    def _iter(self, prefix: tuple[Op, ...] = ()) -> Generator[tuple[Op, ...], None, None]:
-        seq = prefix or ()
+    def _next_ops(self, seq: tuple[Op, ...]) -> tuple[Op, ...]:
         ops = self.generate_options(seq)
 
         if self.i_constraints is not None and (i_constraint := self.i_constraints.get(len(seq))):
             ops = filter(i_constraint, ops)
 
         if self.unique_key:
-            prefix_keys = frozenset(self.unique_key(op) for op in prefix)
+            prefix_keys = frozenset(self.unique_key(op) for op in seq)
             ops = [op for op in ops if self.unique_key(op) not in prefix_keys]
 
         if self.curr_prev_constraint:
@@ -125,15 +158,31 @@ class SequenceBuilder:
             for k, f in self.curr_prev_constraint.items():
                 if abs(k) > len(seq):
                     continue
-                ops = [op for op in ops if f(seq[k], op)]
-        ops = tuple(ops)
+                # precomputed adjacency has no entry for prefix op which is not in options, constraint is called then
+                allowed_ops = self.adjacency[k].get(seq[k]) if self.adjacency is not None else None
+                if allowed_ops is None:
+                    ops = [op for op in ops if f(seq[k], op)]
+                else:
+                    ops = [op for op in ops if op in allowed_ops]
+        return tuple(ops)
+
+    def _state_key(self, seq: tuple[Op, ...]) -> tuple[int, tuple[Op, ...], tuple[Op, ...]]:
+        """
+        all constraints which are allowed with memoize_dead_states depend only on this part of sequence
+        first ops are used by loop check
+        """
+        tail = seq[-self.lookback:] if self.lookback else ()
+        head = seq[:self.lookback] if self.loop else ()
+        return len(seq), tail, head
+
+    def _iter(self, prefix: tuple[Op, ...] = ()) -> Generator[tuple[Op, ...], None, None]:
+        seq = prefix or ()
+        ops = self._next_ops(seq)
         map_func = partial(self._generate_candidates, seq=seq)
 
         if len(prefix) == len(self.prefix):
-            if self.parallel:
-                with ProcessPoolExecutor() as executor:
-                    for it in tqdm.tqdm(executor.map(map_func, ops), total=len(ops)):
-                        yield from it
+            if self.parallel and len(seq) + 1 < self.n:
+                yield from self._iter_parallel(seq, ops)
                 return
             else:
                 it = tqdm.tqdm(map(map_func, ops), total=len(ops))
@@ -142,20 +191,98 @@ class SequenceBuilder:
         it = itertools.chain.from_iterable(it)
         yield from it
 
-    def _generate_candidates(self, op: Op, seq: tuple[Op, ...]) -> Iterable[tuple[Op, ...]]:
-        def inner() -> Iterable[tuple[Op, ...]]:
-            candidate = seq + (op,)
-            if self.candidate_constraint is not None and not self.candidate_constraint(candidate):
-                return
-            if len(candidate) < self.n:
+    def _split(self, seq: tuple[Op, ...], ops: tuple[Op, ...], n_tasks: int) -> list[tuple[Op, ...]]:
+        """
+        expands prefixes level by level (preserving order) until there are at least n_tasks of them
+        so skewed subtrees are split into many small tasks and idle workers take the next task from the shared queue
+        prefixes are never expanded up to full length n
+        """
+        prefixes: list[tuple[Any, ...]] = [seq + (op,) for op in ops]
+        while True:
+            if self.candidate_constraint is not None:
+                prefixes = [p for p in prefixes if self.candidate_constraint(p)]
+            if len(prefixes) == 0 or len(prefixes) >= n_tasks or len(prefixes[0]) >= self.n - 1:
+                return prefixes
+            prefixes = [p + (op,) for p in prefixes for op in self._next_ops(p)]
+
+    def _iter_parallel(self, seq: tuple[Op, ...], ops: tuple[Op, ...]) -> Generator[tuple[Op, ...], None, None]:
+        executor = get_executor()
+        tasks = self._split(seq, ops, n_tasks=N_WORKERS * TASKS_PER_WORKER)
+        # builder is pickled to file once, tasks carry only its path and each worker unpickles it once
+        path = Path(tempfile.gettempdir()) / f'sequence_builder_{uuid.uuid4().hex}.pkl'
+        path.write_bytes(pickle.dumps(self))
+        try:
+            results = executor.map(_worker_iter, itertools.repeat(str(path)), tasks)
+            for chunk in tqdm.tqdm(results, total=len(tasks)):
+                yield from chunk
+        except BrokenProcessPool:
+            shutdown_executor()  # next get_executor() call starts new pool
+            raise
+        finally:
+            path.unlink(missing_ok=True)
+
+    def _generate_candidates(self, op: Op, seq: tuple[Op, ...]) -> Generator[tuple[Op, ...], None, None]:
+        """lazy depth-first: sequences are yielded as soon as they are complete, subtrees are never materialized"""
+        candidate = seq + (op,)
+        if self.candidate_constraint is not None and not self.candidate_constraint(candidate):
+            return
+        if len(candidate) < self.n:
+            if self.dead_states is None:
                 yield from self._iter(prefix=candidate)
                 return
-            if self.curr_prev_constraint and self.loop and not all(
-                f(candidate[(i + k) % self.n], candidate[i])
-                for k, f in self.curr_prev_constraint.items()
-                    for i in range(abs(k))
-            ):
+            key = self._state_key(candidate)
+            if key in self.dead_states:
                 return
-            yield candidate
-        out = tuple(inner())
-        return out
+            found = False
+            for seq_ in self._iter(prefix=candidate):
+                found = True
+                yield seq_
+            if not found:
+                self.dead_states.add(key)
+            return
+        if self.curr_prev_constraint and self.loop and not all(
+            f(candidate[(i + k) % self.n], candidate[i])
+            for k, f in self.curr_prev_constraint.items()
+                for i in range(abs(k))
+        ):
+            return
+        yield candidate
+
+
+N_WORKERS = os.cpu_count() or 1
+TASKS_PER_WORKER = 8
+_executor: ProcessPoolExecutor | None = None
+_executor_pid: int | None = None
+_worker_builders: OrderedDict[str, SequenceBuilder] = OrderedDict()
+_WORKER_BUILDERS_MAXSIZE = 8
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    persistent process pool shared by all parallel SequenceBuilders
+    pool is dropped by shutdown_executor when it breaks, so new one is started on next call
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(max_workers=N_WORKERS)
+        _executor_pid = os.getpid()
+    return _executor
+
+
+@atexit.register
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(cancel_futures=True)
+    _executor = None
+
+
+def _worker_iter(path: str, prefix: tuple[Op, ...]) -> tuple[tuple[Op, ...], ...]:
+    """runs in worker process, builder is loaded from path once and reused between tasks"""
+    sb = _worker_builders.get(path)
+    if sb is None:
+        sb = pickle.loads(Path(path).read_bytes())
+        _worker_builders[path] = sb
+        if len(_worker_builders) > _WORKER_BUILDERS_MAXSIZE:
+            _worker_builders.popitem(last=False)
+    return tuple(sb._iter(prefix))
@@ -0,0 +1,77 @@
+"""
+vectorized versions of voice_leading.checks
+
+chords are represented as int arrays of MIDI codes, shape (n_chords, n_voices), voices sorted ascending
+transition checks take a: (N, V) and b: (M, V) arrays and return (N, M) boolean matrix
+where out[i, j] is check result for transition a[i] -> b[j]
+"""
+
+import itertools
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from musictool.chord import SpecificChord
+
+ChordArray = npt.NDArray[np.int_]
+BoolArray = npt.NDArray[np.bool_]
+
+
+def chords_to_array(chords: Iterable[SpecificChord]) -> ChordArray:
+    """all chords should have same number of notes"""
+    out = np.array([[note.i for note in chord] for chord in chords], dtype=np.int_)
+    if out.ndim != 2:
+        raise ValueError('all chords should have same number of notes')
+    return out
+
+
+def _validate(a: ChordArray, b: ChordArray) -> tuple[ChordArray, ChordArray]:
+    a = np.asarray(a)
+    b = np.asarray(b)
+    if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[1]:
+        raise ValueError(f'expected (N, V) and (M, V) arrays, got shapes {a.shape} and {b.shape}')
+    return a, b
+
+
+def _any_pairwise(a: BoolArray, b: BoolArray) -> BoolArray:
+    """out[i, j] = any(a[i] & b[j]) via integer matmul, avoids materializing (N, M, K) array"""
+    return (a.astype(np.int32) @ b.astype(np.int32).T) > 0  # type: ignore[no-any-return]
+
+
+def parallel_interval(a: ChordArray, b: ChordArray, interval: int, /) -> BoolArray:
+    a, b = _validate(a, b)
+    i, j = np.array(list(itertools.combinations(range(a.shape[1]), 2)), dtype=np.intp).reshape(-1, 2).T
+    a_interval = np.abs(a[:, i] - a[:, j]) % 12 == interval
+    b_interval = np.abs(b[:, i] - b[:, j]) % 12 == interval
+    return _any_pairwise(a_interval, b_interval)
+
+
+def hidden_parallel(a: ChordArray, b: ChordArray, interval: int, /) -> BoolArray:
+    a, b = _validate(a, b)
+    a_low, a_high = a[:, 0, np.newaxis], a[:, -1, np.newaxis]
+    b_low, b_high = b[np.newaxis, :, 0], b[np.newaxis, :, -1]
+    is_same_direction = ((a_low < b_low) & (a_high < b_high)) | ((a_low > b_low) & (a_high > b_high))
+    return is_same_direction & ((b_high - b_low) % 12 == interval)  # type: ignore[no-any-return]
+
+
+def voice_crossing(a: ChordArray, b: ChordArray, /) -> BoolArray:
+    a, b = _validate(a, b)
+    upper = b[np.newaxis, :, :-1] > a[:, np.newaxis, 1:]
+    lower = b[np.newaxis, :, 1:] < a[:, np.newaxis, :-1]
+    return upper.any(axis=2) | lower.any(axis=2)  # type: ignore
+
+
+def large_leaps(a: ChordArray, b: ChordArray, interval: int, /) -> BoolArray:
+    a, b = _validate(a, b)
+    return (np.abs(a[:, np.newaxis, :] - b[np.newaxis, :, :]) > interval).any(axis=2)  # type: ignore[no-any-return]
+
+
+def large_spacing(c: ChordArray, max_interval: int = 12, /) -> BoolArray:
+    """returns (N,) boolean array"""
+    return (np.diff(c, axis=1) > max_interval).any(axis=1)  # type: ignore
+
+
+def small_spacing(c: ChordArray, min_interval: int = 3, /) -> BoolArray:
+    """returns (N,) boolean array"""
+    return (np.diff(c, axis=1) < min_interval).any(axis=1)  # type: ignore
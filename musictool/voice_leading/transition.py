@@ -1,9 +1,19 @@
+from __future__ import annotations
+
+import hashlib
 from collections import defaultdict
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
 
 from musictool.chord import SpecificChord
+from musictool.note import Note
 from musictool.note import SpecificNote
 from musictool.noterange import NoteRange
 from musictool.noteset import NoteSet
+from musictool.util.array_store import ArrayStore
 
 SpecificChordGraph = dict[SpecificChord, frozenset[SpecificChord]]
 AbstractChordGraph = dict[NoteSet, frozenset[NoteSet]]
@@ -57,18 +67,122 @@ def transition_graph(
     unique_abstract: bool = False,
     same_length: bool = True,
 ) -> dict[SpecificChord, frozenset[SpecificChord]]:
-    graph: defaultdict[SpecificChord, set[SpecificChord]] = defaultdict(set)
-
-    def _graph(chord: SpecificChord) -> None:
+    graph: dict[SpecificChord, frozenset[SpecificChord]] = {}
+    stack = [start_chord]
+    while stack:
+        chord = stack.pop()
         if chord in graph:
-            return
+            continue
         childs = chord_transitions(chord, noterange, unique_abstract, same_length)
-        graph[chord] |= childs
-        for child in childs:
-            _graph(child)
-
-    _graph(start_chord)
-    return {k: frozenset(v) for k, v in graph.items()}
+        graph[chord] = childs
+        stack.extend(child for child in childs if child not in graph)
+    return graph
+
+
+class TransitionGraph(ArrayStore):
+    """
+    compact transition graph: chords have integer ids (BFS order from start chord)
+    adjacency is stored in CSR format: neighbors of chord i are indices[indptr[i]:indptr[i + 1]]
+    chords are stored as flat array of MIDI codes: notes of chord i are notes[notes_indptr[i]:notes_indptr[i + 1]]
+    roots[i] is pitch class of root of chord i (-1 if chord has no root), so loaded graph has same chords as built one
+    """
+    ARRAYS = 'indptr', 'indices', 'notes', 'notes_indptr', 'roots'
+
+    def __init__(
+        self,
+        indptr: npt.NDArray[np.int64],
+        indices: npt.NDArray[np.int32],
+        notes: npt.NDArray[np.int16],
+        notes_indptr: npt.NDArray[np.int64],
+        roots: npt.NDArray[np.int8],
+    ):
+        self.indptr = indptr
+        self.indices = indices
+        self.notes = notes
+        self.notes_indptr = notes_indptr
+        self.roots = roots
+        self._chords: dict[int, SpecificChord] = {}
+        self._chord_id: dict[SpecificChord, int] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        start_chord: SpecificChord,
+        noterange: NoteRange,
+        unique_abstract: bool = False,
+        same_length: bool = True,
+    ) -> TransitionGraph:
+        chord_id = {start_chord: 0}
+        chords = [start_chord]
+        indices: list[int] = []
+        indptr = [0]
+        queue = deque(chords)
+        while queue:
+            chord = queue.popleft()
+            for child in sorted(chord_transitions(chord, noterange, unique_abstract, same_length), key=lambda c: c.notes_ascending):
+                i = chord_id.get(child)
+                if i is None:
+                    i = chord_id[child] = len(chords)
+                    chords.append(child)
+                    queue.append(child)
+                indices.append(i)
+            indptr.append(len(indices))
+        graph = cls(
+            indptr=np.array(indptr, dtype=np.int64),
+            indices=np.array(indices, dtype=np.int32),
+            notes=np.array([note.i for chord in chords for note in chord], dtype=np.int16),
+            notes_indptr=np.cumsum([0] + [len(chord) for chord in chords], dtype=np.int64),
+            roots=np.array([-1 if chord.root is None else chord.root.i for chord in chords], dtype=np.int8),
+        )
+        graph._chords = dict(enumerate(chords))
+        graph._chord_id = chord_id
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def chord(self, i: int) -> SpecificChord:
+        chord = self._chords.get(i)
+        if chord is None:
+            codes = self.notes[self.notes_indptr[i]:self.notes_indptr[i + 1]]
+            root = int(self.roots[i])
+            chord = self._chords[i] = SpecificChord(
+                frozenset(SpecificNote.from_i(int(code)) for code in codes),
+                root=None if root == -1 else Note.from_i(root),
+            )
+        return chord
+
+    def chord_id(self, chord: SpecificChord) -> int:
+        if self._chord_id is None:
+            self._chord_id = {self.chord(i): i for i in range(len(self))}
+        return self._chord_id[chord]
+
+    def neighbor_ids(self, i: int) -> npt.NDArray[np.int32]:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def neighbors(self, chord: SpecificChord) -> frozenset[SpecificChord]:
+        return frozenset(self.chord(int(j)) for j in self.neighbor_ids(self.chord_id(chord)))
+
+    def to_dict(self) -> SpecificChordGraph:
+        return {self.chord(i): frozenset(self.chord(int(j)) for j in self.neighbor_ids(i)) for i in range(len(self))}
+
+    @classmethod
+    def load_or_build(
+        cls,
+        directory: str | Path,
+        start_chord: SpecificChord,
+        noterange: NoteRange,
+        unique_abstract: bool = False,
+        same_length: bool = True,
+    ) -> TransitionGraph:
+        """graph is built once for given arguments and saved to subdirectory of directory, next calls memory-map it"""
+        key = repr((cls.ARRAYS, start_chord, noterange, unique_abstract, same_length))  # ARRAYS: directories of older formats are not reused
+        path = Path(directory) / hashlib.sha1(key.encode()).hexdigest()
+        return cls._load_or_build(path, lambda: cls.build(start_chord, noterange, unique_abstract, same_length))
 
 
 def abstract_graph(g: SpecificChordGraph) -> AbstractChordGraph:
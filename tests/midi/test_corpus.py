@@ -0,0 +1,44 @@
+import json
+
+import mido
+import numpy as np
+
+from musictool.midi import corpus
+from musictool.midi import parse
+
+
+def write_midi(path, notes):
+    mid = mido.MidiFile(type=0, ticks_per_beat=96)
+    track = mido.MidiTrack()
+    for note in notes:
+        track.append(mido.Message('note_on', note=note, velocity=100, time=0))
+        track.append(mido.Message('note_off', note=note, velocity=0, time=10))
+    mid.tracks.append(track)
+    mid.save(path)
+
+
+def test_ingest_corpus(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'sub').mkdir(parents=True)
+    write_midi(src / 'a.mid', [60, 62])
+    write_midi(src / 'sub' / 'b.mid', [48, 50, 52])
+    write_midi(src / 'c.mid', [])
+    (src / 'broken.mid').write_bytes(b'garbage')
+
+    table = corpus.ingest_corpus(src, tmp_path / 'out', max_workers=2)
+    assert table.files == ('a.mid', 'c.mid', 'sub/b.mid')
+    assert len(table) == 5
+    assert table.pitch.tolist() == [60, 62, 48, 50, 52]
+    assert table.file_id.tolist() == [0, 0, 2, 2, 2]
+    assert table.on.tolist() == [0, 10, 0, 10, 20]
+    assert table.off.tolist() == [10, 20, 10, 20, 30]
+
+    meta = json.loads((tmp_path / 'out' / 'meta.json').read_text())
+    assert meta['errors'].keys() == {'broken.mid'}
+
+    loaded = corpus.load_corpus(tmp_path / 'out')
+    assert isinstance(loaded.pitch, np.memmap)
+    assert loaded.files == table.files
+    b = loaded.file_notes(2)
+    assert b.pitch.tolist() == [n[2] for n in parse.iter_raw_notes(src / 'sub' / 'b.mid')]
+    assert len(loaded.file_notes(1).pitch) == 0
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from musictool.midi.index import NoteIndex
+from musictool.midi.parse import MidiNote
+from musictool.note import SpecificNote
+
+
+@pytest.fixture
+def notes():
+    random.seed(0)
+    out = []
+    for _ in range(300):
+        on = random.randint(0, 1000)
+        out.append(MidiNote(note=SpecificNote.from_i(random.randint(30, 90)), on=on, off=on + random.choice((0, 1, 5, 50, 400)), track=0))
+    return out
+
+
+def key(notes):
+    return sorted((n.on, n.off, n.note.i) for n in notes)
+
+
+def test_at(notes):
+    index = NoteIndex(notes)
+    assert len(index) == len(notes)
+    for t in range(-5, 1500, 7):
+        assert key(index.at(t)) == key(n for n in notes if n.on <= t < n.off)
+
+
+@pytest.mark.parametrize('width', (1, 10, 300))
+def test_overlapping(notes, width):
+    index = NoteIndex(notes)
+    for start in range(-20, 1500, 13):
+        stop = start + width
+        assert key(index.overlapping(start, stop)) == key(n for n in notes if n.on < stop and n.off > start and n.on < n.off)
+
+
+def test_starting(notes):
+    index = NoteIndex(notes)
+    assert key(index.starting(100, 200)) == key(n for n in notes if 100 <= n.on < 200)
+    assert [n.on for n in index.starting(0, 2000)] == sorted(n.on for n in notes)
+
+
+def test_empty():
+    index = NoteIndex([])
+    assert index.at(0) == []
+    assert index.overlapping(0, 10) == []
@@ -0,0 +1,98 @@
+import mido
+import numpy as np
+import pytest
+
+from musictool.midi import parse
+
+
+@pytest.fixture
+def midi_path(tmp_path):
+    mid = mido.MidiFile(type=1, ticks_per_beat=96)
+    t0 = mido.MidiTrack()
+    t0.append(mido.MetaMessage('track_name', name='t0'))
+    t0.append(mido.Message('program_change', program=5, time=0))
+    t0.append(mido.Message('note_on', note=60, velocity=100, time=0))
+    t0.append(mido.Message('note_on', note=64, velocity=100, time=10))
+    t0.append(mido.Message('sysex', data=(1, 2, 3), time=0))
+    t0.append(mido.Message('note_on', note=60, velocity=0, time=20))  # note_on with velocity 0 is note_off
+    t0.append(mido.Message('note_off', note=64, velocity=0, time=5))
+    t0.append(mido.Message('note_on', note=67, velocity=100, time=100))
+    t0.append(mido.Message('note_off', note=67, velocity=0, time=50))
+    t1 = mido.MidiTrack()
+    t1.append(mido.Message('control_change', control=7, value=100, time=0))
+    t1.append(mido.Message('note_on', note=48, velocity=100, time=5))
+    t1.append(mido.Message('note_off', note=48, velocity=0, time=200))
+    t1.append(mido.Message('note_on', note=50, velocity=100, channel=1, time=0))
+    t1.append(mido.Message('note_off', note=50, velocity=0, channel=1, time=10))
+    mid.tracks.extend((t0, t1))
+    path = tmp_path / 'test.mid'
+    mid.save(path)
+    return path
+
+
+EXPECTED = [
+    (0, 30, 60, 0),
+    (5, 205, 48, 1),
+    (10, 35, 64, 0),
+    (135, 185, 67, 0),
+    (205, 215, 50, 1),
+]
+
+
+@pytest.mark.parametrize('block_size', (1, 3, 2 ** 16))
+def test_iter_raw_notes(midi_path, block_size):
+    assert list(parse.iter_raw_notes(midi_path, block_size=block_size)) == EXPECTED
+
+
+def test_iter_notes_matches_parse_notes(midi_path):
+    expected = sorted(parse.parse_notes(mido.MidiFile(midi_path)), key=lambda n: (n.on, n.track))
+    notes = list(parse.iter_notes(midi_path))
+    assert [(n.note, n.on, n.off, n.track) for n in notes] == [(n.note, n.on, n.off, n.track) for n in expected]
+
+
+def test_iter_note_columns(midi_path):
+    batches = list(parse.iter_note_columns(midi_path, batch_size=2))
+    assert [len(b.on) for b in batches] == [2, 2, 1]
+    pitch = np.concatenate([b.pitch for b in batches])
+    off = np.concatenate([b.off for b in batches])
+    assert pitch.tolist() == [n[2] for n in EXPECTED]
+    assert off.tolist() == [n[1] for n in EXPECTED]
+
+
+def test_not_midi(tmp_path):
+    path = tmp_path / 'x.mid'
+    path.write_bytes(b'RIFF0000')
+    with pytest.raises(ValueError):
+        parse.track_chunks(path)
+
+
+def test_parse_notes_overlapping_same_pitch(tmp_path):
+    mid = mido.MidiFile(type=0, ticks_per_beat=96)
+    track = mido.MidiTrack()
+    track.append(mido.Message('note_on', note=60, velocity=100, channel=0, time=0))
+    track.append(mido.Message('note_on', note=60, velocity=100, channel=1, time=10))  # same pitch, other channel
+    track.append(mido.Message('note_on', note=60, velocity=100, channel=0, time=10))  # same pitch and channel, nested
+    track.append(mido.Message('note_off', note=60, velocity=0, channel=0, time=10))
+    track.append(mido.Message('note_off', note=60, velocity=0, channel=1, time=10))
+    track.append(mido.Message('note_off', note=60, velocity=0, channel=0, time=10))
+    track.append(mido.Message('note_on', note=62, velocity=100, time=0))  # never released
+    track.append(mido.Message('control_change', control=7, value=100, time=25))
+    mid.tracks.append(track)
+    path = tmp_path / 'test.mid'
+    mid.save(path)
+    expected = [(0, 50, 60, 0), (10, 40, 60, 0), (20, 30, 60, 0), (50, 75, 62, 0)]
+    assert [(n.on, n.off, n.note.i, n.track) for n in parse.parse_notes(mido.MidiFile(path))] == expected
+    assert list(parse.iter_raw_notes(path)) == expected
+
+
+def test_iter_raw_notes_single_file_object(midi_path, monkeypatch):
+    files = []
+
+    def open_(*args, **kwargs):
+        files.append(open(*args, **kwargs))
+        return files[-1]
+
+    monkeypatch.setattr(parse, 'open', open_, raising=False)
+    assert list(parse.iter_raw_notes(midi_path, block_size=1)) == EXPECTED
+    assert len(files) == 1
+    assert files[0].closed
@@ -1,10 +1,17 @@
+import asyncio
 import os
+import time
 
 import pytest
 
 from musictool.chord import SpecificChord
+from musictool.midi.player import Event
 from musictool.midi.player import Player
+from musictool.midi.player import progression_events
+from musictool.midi.player import rhythm_events
 from musictool.note import SpecificNote
+from musictool.progression import Progression
+from musictool.rhythm import Rhythm
 
 
 @pytest.fixture
@@ -41,3 +48,100 @@ async def test_specific_chord(player, capsys):
     on, off = set(stdout_[:3]), set(stdout_[3:])
     assert on == {'note_on note=12, channel=0', 'note_on note=16, channel=0', 'note_on note=31, channel=0'}
     assert off == {'note_off note=12, channel=0', 'note_off note=16, channel=0', 'note_off note=31, channel=0'}
+
+
+class FakePort:
+    """records (time, message) of every send"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append((self.clock(), message))
+
+
+def test_progression_events():
+    progression = Progression((SpecificChord.from_str('C1_E1'), SpecificChord.from_str('D1_F1')))
+    events = list(progression_events(progression, seconds=0.5))
+    assert [e.seconds for e in events] == [0, 0, 0.5, 0.5, 0.5, 0.5, 1, 1]
+    assert events == sorted(events, key=lambda e: e.sort_key)
+
+
+def test_rhythm_events():
+    rhythm = Rhythm((1, 0, 1, 1), bar_notes=4)
+    events = list(rhythm_events(rhythm, [SpecificNote.from_i(60)] * 2))
+    assert len(events) == 2 * 3 * 2
+    assert events == sorted(events, key=lambda e: e.sort_key)
+    assert events[-1].seconds == pytest.approx(2 * rhythm.bar_seconds)
+
+
+class VirtualClock:
+    """time advances only when sleep is awaited, each sleep can be late by oversleep seconds"""
+
+    def __init__(self, oversleep=0.0):
+        self.now = 0.0
+        self.oversleep = oversleep
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay + self.oversleep
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_virtual_clock():
+    clock = VirtualClock()
+    port = FakePort(clock)
+    player = Player(port=port, clock=clock, sleep=clock.sleep)
+    rhythm = Rhythm((1, 0, 1, 1) * 4, beats_per_minute=60)  # 16 seconds of virtual time
+    events = sorted(rhythm_events(rhythm, [SpecificNote.from_i(60)] * 4), key=lambda e: e.sort_key)
+    await player.play_events(events)
+    assert [(t, m.type) for t, m in port.sent] == [(pytest.approx(e.seconds), e.type) for e in events]
+
+
+@pytest.mark.asyncio
+async def test_play_events_unordered_and_grouped():
+    clock = VirtualClock()
+    port = FakePort(clock)
+    player = Player(port=port, clock=clock, sleep=clock.sleep)
+    events = [Event(0.02, 'note_off', 0), Event(0, 'note_on', 0), Event(0.02, 'note_on', 0), Event(0.03, 'note_off', 0)]
+    await player.play_events(events)
+    assert [(m.type, m.note) for _, m in port.sent] == [('note_on', 24), ('note_off', 24), ('note_on', 24), ('note_off', 24)]
+    assert [t for t, _ in port.sent] == pytest.approx([0, 0.02, 0.02, 0.03])
+    assert port.sent[1][0] == port.sent[2][0]  # same group is sent after single wait
+
+
+@pytest.mark.asyncio
+async def test_play_progression_and_rhythm():
+    port = FakePort()
+    player = Player(port=port)
+    progression = Progression((SpecificChord.from_str('C1_E1_G1'), SpecificChord.from_str('D1_F1_A1')))
+    await player.play(progression, seconds=0.005)
+    assert len(port.sent) == 12
+    port.sent.clear()
+    rhythm = Rhythm((1, 0, 1, 0), bar_notes=4, beats_per_minute=6000)
+    await player.play_rhythm(rhythm, SpecificNote.from_i(60))
+    assert [m.type for _, m in port.sent] == ['note_on', 'note_off'] * 2
+
+
+@pytest.mark.asyncio
+async def test_lateness_does_not_accumulate():
+    """
+    long lazy sequence with clock which is late after every sleep
+    deadlines are absolute, so each message is late at most by one oversleep
+    real clock accuracy is measured by musictool.benchmark
+    """
+    clock = VirtualClock(oversleep=0.001)
+    port = FakePort(clock)
+    player = Player(port=port, clock=clock, sleep=clock.sleep)
+    rhythm = Rhythm((1, 0, 1, 1) * 4, beats_per_minute=1200)  # 16th notes of 12.5ms
+    bars = [SpecificChord.from_str('C1_E1_G1')] * 8
+    events = list(rhythm_events(rhythm, bars))
+    await player.play_events(iter(events), lookahead=0.05)
+    assert len(port.sent) == len(events)
+    lateness = [t - e.seconds for (t, _), e in zip(port.sent, sorted(events, key=lambda e: e.sort_key))]
+    assert min(lateness) == pytest.approx(0, abs=1e-9)
+    assert max(lateness) == pytest.approx(0.001)
@@ -1,4 +1,7 @@
+import functools
+import gc
 import operator
+import pickle
 
 import pytest
 
@@ -10,6 +13,10 @@ from musictool.noteset import NoteSet
 from musictool.progression import Progression
 from musictool.scale import Scale
 from musictool.util.cache import Cached
+from musictool.util.cache import CacheInfo
+from musictool.util.cache import LRUCache
+from musictool.util.cache import UnboundedCache
+from musictool.util.cache import WeakValueCache
 
 
 @pytest.mark.parametrize(
@@ -129,3 +136,133 @@ def test_cached_class():
 
     assert K(1) is K(1)
     assert K(1) is not K(2)
+
+
+@pytest.mark.parametrize(
+    'cls, cache_type', (
+        (Note, UnboundedCache),
+        (SpecificNote, UnboundedCache),
+        (NoteSet, UnboundedCache),
+        (Chord, UnboundedCache),
+        (Scale, UnboundedCache),
+        (SpecificChord, WeakValueCache),
+        (Progression, LRUCache),
+    ),
+)
+def test_cache_policy(cls, cache_type):
+    assert type(cls._cache) is cache_type
+
+
+def test_cache_per_class():
+    assert NoteSet._cache is not Chord._cache
+    assert NoteSet._cache is not Scale._cache
+
+
+def test_cache_info():
+    class K(Cached):
+        def __init__(self, x):
+            self.x = x
+
+    K(1)
+    K(1)
+    K(2)
+    assert K.cache_info() == CacheInfo(hits=1, misses=2, maxsize=None, currsize=2)
+    K.cache_clear()
+    assert K.cache_info() == CacheInfo(hits=0, misses=0, maxsize=None, currsize=0)
+
+
+def test_lru_cache():
+    class K(Cached):
+        _cache_factory = functools.partial(LRUCache, maxsize=2)
+
+        def __init__(self, x):
+            self.x = x
+
+    a = K(1)
+    K(2)
+    assert K(1) is a
+    K(3)  # evicts K(2)
+    assert K(1) is a
+    assert K.cache_info().currsize == 2
+    assert len(K._cache) == 2
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_weak_value_cache():
+    class K(Cached):
+        _cache_factory = WeakValueCache
+
+        def __init__(self, x):
+            self.x = x
+
+    a = K(1)
+    b = K(2)
+    assert K(1) is a
+    assert K.cache_info().currsize == 2
+    del b
+    gc.collect()
+    assert K.cache_info().currsize == 1
+    assert K(1) is a
+
+
+def test_set_cache():
+    class K(Cached):
+        def __init__(self, x):
+            self.x = x
+
+    a = K(1)
+    K.set_cache(LRUCache(maxsize=10))
+    assert K.cache_info().maxsize == 10
+    assert K(1) is not a
+    assert K(1) == K(1)
+
+
+def test_init_runs_once():
+    n_inits = 0
+
+    class K(Cached):
+        def __init__(self, x):
+            nonlocal n_inits
+            n_inits += 1
+            self.x = x
+
+    assert K(1) is K(1) is K(1)
+    assert n_inits == 1
+    K(2)
+    assert n_inits == 2
+
+
+def test_failed_init_not_cached():
+    class K(Cached):
+        def __init__(self, x):
+            if x < 0:
+                raise ValueError
+            self.x = x
+
+    with pytest.raises(ValueError):
+        K(-1)
+    assert K.cache_info().currsize == 0
+    with pytest.raises(ValueError):
+        K(-1)
+
+
+@pytest.mark.parametrize(
+    'obj', (
+        Note('C'),
+        SpecificNote('C', 1),
+        NoteSet.from_str('CDE/C'),
+        Scale.from_name('C', 'major'),
+        Chord.from_name('C', 'major'),
+        SpecificChord.from_str('C1_E1_G1'),
+    ),
+)
+def test_unpickled_is_interned(obj):
+    assert pickle.loads(pickle.dumps(obj)) is obj
+
+
+def test_specific_chord_cache_key_root():
+    notes = frozenset({SpecificNote('C', 5), SpecificNote('E', 5)})
+    codes, root = SpecificChord._cache_key(notes, root='C')
+    assert type(root) is Note
+    assert (codes, root) == SpecificChord._cache_key(notes, root=Note('C'))
@@ -172,3 +172,21 @@ def test_add(chord, add, expected):
     assert SpecificChord.from_str(chord) + add == SpecificChord.from_str(expected)
     with pytest.raises(TypeError):
         chord + [1]
+
+
+def test_specific_chord_codes():
+    chord = SpecificChord.from_str('G1_C1_E1/C')
+    assert chord.codes == (12, 16, 19)
+    assert chord.key == ((12, 16, 19), Note('C'))
+    assert SpecificChord.from_codes((19, 12, 16), root='C') is chord
+    assert chord.notes_ascending == tuple(map(SpecificNote.from_str, ('C1', 'E1', 'G1')))
+    assert chord.root_specific == frozenset({SpecificNote('C', 1)})
+    assert chord.abstract is Chord.from_str('CEG/C')
+    assert not hasattr(chord, '__dict__')
+
+
+def test_specific_chord_validation():
+    with pytest.raises(TypeError):
+        SpecificChord((SpecificNote('C', 1),))  # type: ignore
+    with pytest.raises(KeyError):
+        SpecificChord.from_str('C1_E1_G1/D')
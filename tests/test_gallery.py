@@ -0,0 +1,74 @@
+import io
+import re
+from xml.etree import ElementTree
+
+import pytest
+
+from musictool.chord import SpecificChord
+from musictool.gallery import render_cards
+from musictool.gallery import write_cards
+from musictool.noterange import NoteRange
+from musictool.piano import template_defs
+from musictool.scale import ComparedScales
+from musictool.scale import Scale
+from musictool.scale import all_scales
+
+
+@pytest.fixture
+def cards():
+    scales = list(all_scales['diatonic'].values())
+    return [
+        *scales,
+        *(ComparedScales(scales[0], s) for s in scales[:5]),
+        SpecificChord.from_str('C1_E1_G1'),
+        NoteRange('C2', 'C4'),
+    ]
+
+
+def key_fills(svg):
+    """last drawn fill of each key"""
+    out = {}
+    for r in ElementTree.fromstring(svg).iter('rect'):
+        if r.attrib.get('class') == 'note':
+            match = re.match('.*fill:#(.{6})', r.attrib['style'])
+            assert match is not None
+            out[r.attrib['note']] = match.group(1)
+    return out
+
+
+def resolve_uses(svg, defs):
+    groups = dict(re.findall(r"<g id='(.+?)'>(.*?)</g>(?=<g id=|$)", defs))
+    return re.sub(r"<use href='#(.+?)'/>", lambda m: groups[m.group(1)], svg)
+
+
+def test_svg_use_matches_full_render(cards):
+    for card in cards:
+        piano = card.to_piano()
+        svg = resolve_uses(piano.svg_use('t'), template_defs(piano.layout_args, 't'))
+        assert key_fills(svg) == key_fills(piano._repr_svg_(pretty=False))
+
+
+def test_render_cards(cards):
+    html = render_cards(cards)
+    assert len(re.findall("<div class='card[ ']", html)) == len(cards)
+    assert html.count("<svg class='piano_templates'>") == len({card.to_piano().layout_args for card in cards})
+    title = Scale.from_name('C', 'major').card_data().title
+    assert title is not None and title in html
+    assert 'C1_E1_G1' in html
+    assert len(html) < sum(len(card._repr_html_()) for card in cards) * 0.75
+
+
+def test_card_data_overrides(cards):
+    html = render_cards([cards[0].card_data(title='title_QWE', background_color='#123456')])
+    assert 'title_QWE' in html
+    assert "style='background-color: #123456;'" in html
+
+
+def test_stream(cards, tmp_path):
+    html = render_cards(cards)
+    path = tmp_path / 'gallery.html'
+    write_cards(cards, path)
+    assert path.read_text() == html
+    f = io.StringIO()
+    write_cards(iter(cards), f)
+    assert f.getvalue() == html
@@ -154,3 +154,16 @@ def test_html_noterange(noterange, title, subtitle, header_href, background_colo
         background_color=background_color,
     )
     html_helper(html, html_classes, title, subtitle, header_href, background_color)
+
+
+@pytest.mark.parametrize(
+    'card, html_classes', (
+        (Chord.from_name('C', 'major'), ('card',)),
+        (SpecificChord.from_str('C1_E1_G1'), ('card',)),
+        (NoteRange('C2', 'C5'), ('card',)),
+        (ComparedScales(Scale.from_name('C', 'major'), Scale.from_name('A', 'minor')), ('card',)),
+        (Scale.from_name('C', 'major'), ('major',)),
+    ),
+)
+def test_html_default_classes(card, html_classes):
+    assert f"class='{' '.join(('card', *html_classes))}'" in card._repr_html_()
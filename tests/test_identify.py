@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from musictool.chord import Chord
+from musictool.chord import SpecificChord
+from musictool.identify import Interpretation
+from musictool.identify import identify
+from musictool.identify import interpretations
+from musictool.identify import notes_mask
+from musictool.note import Note
+from musictool.noteset import mask_to_notes
+from musictool.scale import Scale
+from musictool.scale import all_scales
+
+
+def brute_force(notes):
+    notes = frozenset(notes)
+    candidates: list[Chord | Scale] = [Chord.from_name(root, name) for root in map(Note.from_i, range(12)) for name in Chord.name_to_intervals]
+    candidates += [scale for scales in all_scales.values() for scale in scales.values()]
+    return {(c.root, c.name, c.notes - notes) for c in candidates if notes <= c.notes}
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_interpretations(seed):
+    random.seed(seed)
+    notes = mask_to_notes(random.randrange(1, 4096) & random.randrange(1, 4096) & random.randrange(1, 4096) or 1)
+    out = interpretations(notes)
+    assert {(i.root, i.name, i.missing) for i in out} == brute_force(notes)
+    assert [len(i.missing) for i in out] == sorted(len(i.missing) for i in out)
+
+
+def test_identify():
+    chord = SpecificChord.from_str('E1_G2_C3_C4')
+    out = identify(chord)
+    assert out == identify(n.i for n in chord) == identify(Note(n) for n in 'CEG')
+    assert out[0] == Interpretation(Note('C'), 'major', 'chord', frozenset())
+    assert out[0].to_noteset() == Chord.from_name('C', 'major')
+    assert identify(map(Note, 'CDEFGAB')) == tuple(
+        Interpretation(note, name, 'diatonic', frozenset())
+        for note, name in sorted(Scale.from_name('C', 'major').note_scales.items(), key=lambda kv: kv[0].i)
+    )
+    assert identify(map(Note, 'CdD')) == ()
+    assert identify([]) == ()
+
+
+def test_max_missing():
+    out = interpretations(map(Note, 'CE'), max_missing=1)
+    assert out
+    assert all(len(i.missing) <= 1 for i in out)
+    assert Interpretation(Note('C'), 'major', 'chord', frozenset({Note('G')})) in out
+
+
+def test_notes_mask():
+    assert notes_mask([60, 64, 67]) == notes_mask(map(Note, 'CEG')) == 0b10010001
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from musictool.modulation import ModulationGraph
+from musictool.modulation import modulation_graph
+from musictool.modulation import modulation_path
+from musictool.scale import Scale
+
+
+def floyd_warshall(cost):
+    dist = cost.copy()
+    np.fill_diagonal(dist, 0)
+    for k in range(len(dist)):
+        dist = np.minimum(dist, dist[:, k, np.newaxis] + dist[np.newaxis, k, :])
+    return dist
+
+
+@pytest.mark.parametrize('kind', ('diatonic', 'harmonic', 'pentatonic'))
+@pytest.mark.parametrize('max_changed', (1, 2))
+def test_all_pairs(kind, max_changed):
+    graph = ModulationGraph(kind, max_changed=max_changed)
+    assert np.array_equal(graph.all_pairs(), floyd_warshall(graph.cost))
+
+
+@pytest.mark.parametrize('triad_weight', (0, 0.5))
+def test_path(triad_weight):
+    graph = modulation_graph('diatonic', triad_weight=triad_weight)
+    source = Scale.from_name('C', 'major')
+    for target in graph.scales:
+        path = graph.path(source, target)
+        assert path[0] is source
+        assert path[-1] is target
+        cost = sum(graph.cost[graph.table.index[a], graph.table.index[b]] for a, b in zip(path, path[1:]))
+        assert cost == pytest.approx(graph.distance(source, target))
+        for a, b in zip(path, path[1:]):
+            assert len(a.notes - b.notes) <= 1
+
+
+def test_modulation_path():
+    # relative minor: same notes, one step
+    assert modulation_path(Scale.from_name('C', 'major'), Scale.from_name('A', 'minor')) == (Scale.from_name('C', 'major'), Scale.from_name('A', 'minor'))
+    # circle of fifths: each step changes one note
+    path = modulation_path(Scale.from_name('C', 'major'), Scale.from_name('D', 'major'), triad_weight=0)
+    assert len(path) == 3
+    assert modulation_graph('diatonic', triad_weight=0) is modulation_graph('diatonic', triad_weight=0)
+    with pytest.raises(ValueError):
+        modulation_path(Scale.from_name('C', 'major'), Scale.from_name('C', 'p_major'))
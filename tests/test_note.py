@@ -7,6 +7,7 @@ from hypothesis import given
 from musictool.note import Note
 from musictool.note import SpecificNote
 from musictool.note import str_to_note
+from musictool.noteset import NoteSet
 
 
 @pytest.mark.parametrize(
@@ -114,3 +115,35 @@ def test_str_to_note():
 
 def test_to_abstract():
     assert SpecificNote.to_abstract({SpecificNote('C', 2), SpecificNote('G', 3)}) == frozenset({Note('C'), Note('G')})
+
+
+def test_preallocated():
+    for i in range(-30, 160):
+        note = SpecificNote.from_i(i)
+        assert note is SpecificNote(Note.from_i(i), i // 12)
+        assert note.abstract is Note.from_i(i) is Note(note.abstract.name)
+        for steps in (-13, -1, 0, 1, 7, 12, 25):
+            assert note + steps is SpecificNote.from_i(i + steps)
+            assert note.abstract + steps is Note.from_i(i + steps)
+
+
+@pytest.mark.parametrize('op', (operator.lt, operator.le, operator.gt, operator.ge, operator.eq, operator.ne))
+def test_comparison_operators(op):
+    notes = [SpecificNote.from_i(i) for i in range(-3, 15)]
+    assert all(op(a, b) == op(a.i, b.i) for a in notes for b in notes)
+    abstract = [Note.from_i(i) for i in range(12)]
+    assert all(op(a, b) == op(a.i, b.i) == op(a, b.name) for a in abstract for b in abstract)
+
+
+@pytest.mark.parametrize('op', (operator.lt, operator.le, operator.gt, operator.ge))
+@pytest.mark.parametrize('note', (Note('C'), SpecificNote('C', 1)))
+def test_comparison_not_supported(op, note):
+    with pytest.raises(TypeError):
+        op(note, 1)
+
+
+def test_specific_note_cache_key():
+    note = SpecificNote.from_i(50)
+    assert SpecificNote('D', 4) is SpecificNote(Note('D'), octave=4) is SpecificNote(abstract='D', octave=4) is note
+    assert NoteSet.from_str('CDEFGAB').add_note(SpecificNote.from_i(48), 1) is note
+    assert SpecificNote('D', 4) is not SpecificNote('D', 5)
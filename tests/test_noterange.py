@@ -131,3 +131,30 @@ def test_noterange_list(noterange, expected):
 def test_sequence():
     nr = NoteRange(SpecificNote('C', 1), SpecificNote('C', 2))
     assert isinstance(nr, Sequence)
+
+
+@pytest.mark.parametrize(
+    'start, stop, noteset', (
+        ('C0', 'C3', NoteSet.from_str(config.chromatic_notes)),
+        ('b-2', 'E4', NoteSet.from_str(config.chromatic_notes)),
+        ('a-1', 'f2', NoteSet.from_str('fa')),
+        ('D1', 'E5', Scale.from_name('D', 'dorian')),
+        ('e1', 'G3', Chord.from_str('eGb/e')),
+    ),
+)
+def test_offset_table(start, stop, noteset):
+    """arithmetic indexing agrees with walking noteset note by note"""
+    noterange = NoteRange(start, stop, noteset)
+    expected = [noterange.start]
+    while expected[-1] != noterange.stop:
+        expected.append(noteset.add_note(expected[-1], 1))
+    assert list(noterange) == expected
+    assert len(noterange) == len(expected)
+    assert [noterange[i] for i in range(-len(expected), len(expected))] == expected * 2
+    assert noterange.to_midi_array().tolist() == [note.i for note in expected]
+    assert all(noterange.index(note) == i for i, note in enumerate(expected))
+    outside = {noterange.start + i for i in range(-13, (noterange.stop - noterange.start) + 13)} - set(expected)
+    assert not any(note in noterange for note in outside)
+    for note in outside:
+        with pytest.raises(ValueError):
+            noterange.index(note)
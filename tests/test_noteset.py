@@ -8,6 +8,9 @@ from musictool.note import SpecificNote
 from musictool.noteset import NoteSet
 from musictool.noteset import bits_to_intervals
 from musictool.noteset import intervals_to_bits
+from musictool.noteset import intervals_to_mask
+from musictool.noteset import mask_to_bits
+from musictool.noteset import rotate_mask
 from musictool.scale import Scale
 from musictool.scale import all_scales
 
@@ -310,3 +313,33 @@ def test_subtract_types():
         noteset.subtract('C', SpecificNote('D', 1))
     with pytest.raises(TypeError):
         noteset.subtract('D1', Note('C'))
+
+
+@pytest.mark.parametrize(
+    'notes, mask, intervals_mask', (
+        ('CDEFGAB/C', 0b101010110101, 0b101010110101),
+        ('CEG/E', 0b000010010001, 0b000100001001),
+        ('dfb/d', 0b010001000010, 0b001000100001),
+        ('CDE', 0b000000010101, 0),
+        ('', 0, 0),
+    ),
+)
+def test_mask(notes, mask, intervals_mask):
+    noteset = NoteSet.from_str(notes)
+    assert noteset.mask == mask
+    assert noteset.intervals_mask == intervals_mask
+    assert intervals_to_mask(noteset.intervals) == intervals_mask
+    assert mask_to_bits(intervals_mask) == noteset.bits
+
+
+@pytest.mark.parametrize(
+    'mask, n, expected', (
+        (0b000000000001, 1, 0b000000000010),
+        (0b100000000000, 1, 0b000000000001),
+        (0b000000000001, -1, 0b100000000000),
+        (0b000010010001, 12, 0b000010010001),
+        (0b000010010001, 2, 0b001001000100),
+    ),
+)
+def test_rotate_mask(mask, n, expected):
+    assert rotate_mask(mask, n) == expected
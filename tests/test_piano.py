@@ -133,3 +133,29 @@ def test_startswith_endswith_white_key(noterange, black_small, start, stop):
     notes = note_info(svg, element='rect', class_='note').keys()
     assert min(notes) == start
     assert max(notes) == stop
+
+
+@pytest.mark.parametrize('black_small', [True, False])
+def test_compact_and_cache(black_small):
+    kw = {'note_colors': {Note('C'): config.RED}, 'squares': {Note('E'): {'text': 'T'}}, 'black_small': black_small}
+    piano = Piano(**kw)
+    compact = piano._repr_svg_(pretty=False)
+    assert '\n' not in compact
+    assert Piano.pretty_print(compact) == piano._repr_svg_()
+    assert Piano(**kw)._repr_svg_(pretty=False) is compact
+    assert Piano(**kw | {'note_colors': {Note('C'): config.GREEN}})._repr_svg_(pretty=False) != compact
+    assert Piano(black_small=black_small).layout is Piano(black_small=black_small, note_colors={Note('C'): config.RED}).layout
+    assert isinstance(piano.rects, tuple)
+    assert piano.rects is Piano(**kw).rects
+
+
+@pytest.mark.parametrize('black_small', [True, False])
+def test_coord_helper(black_small):
+    piano = Piano(black_small=black_small)
+    keys = {note: piano.coord_helper(note) for note in piano.noterange}
+    assert keys[SpecificNote('C', 0)][0] == 0
+    assert keys[SpecificNote('D', 0)][0] == (piano.ww if black_small else 2 * piano.ww)
+    if black_small:
+        assert keys[SpecificNote('d', 0)][:3] == (piano.ww - piano.bw // 2, piano.bw, piano.bh)
+    with pytest.raises(KeyError):
+        piano.coord_helper(SpecificNote('C', 5))
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from musictool.note import SpecificNote
@@ -105,3 +106,28 @@ def test_transpose(note, transpose, hz):
     pitch = Pitch(transpose=transpose)
     assert pitch.note_to_hz(note) == hz
     assert pitch.hz_to_note(hz) == note
+
+
+@pytest.mark.parametrize('hz_tuning', (HZ_440, 432))
+@pytest.mark.parametrize('transpose', (0, 1, -0.5))
+def test_arrays(hz_tuning, transpose):
+    pitch = Pitch(hz_tuning, transpose=transpose)
+    codes = np.arange(128)
+    hz = pitch.note_i_to_hz_array(codes)
+    assert hz.tolist() == [pitch.note_i_to_hz(i) for i in range(128)]
+    assert pitch.midi_hz is Pitch(hz_tuning, transpose=transpose).midi_hz
+    assert pitch.notes_to_hz(SpecificNote.from_i(i) for i in (12, 60, 127)).tolist() == [pitch.note_to_hz(SpecificNote.from_i(i)) for i in (12, 60, 127)]
+    note_i = np.array([[-5.5, 0.25], [60.5, 200]])
+    assert pitch.note_i_to_hz_array(note_i) == pytest.approx(np.vectorize(pitch.note_i_to_hz)(note_i))
+    assert pitch.hz_to_note_i_array(hz) == pytest.approx(codes)
+    assert pitch.hz_to_i_array([HZ_220, HZ_880]) == pytest.approx([pitch.hz_to_i(HZ_220), pitch.hz_to_i(HZ_880)])
+    assert pitch.i_to_hz_array([-12, 0.5]) == pytest.approx([pitch.i_to_hz(-12), pitch.i_to_hz(0.5)])
+    notes_hz = [pitch.note_to_hz(note) for note in (A4, A5, C5, B5, A6)]
+    assert pitch.hz_to_note_codes(notes_hz).tolist() == [pitch.hz_to_note(x).i for x in notes_hz]
+
+
+def test_px_arrays():
+    hz = np.array([55, 110, 220, 440, 880])
+    px = Pitch.hz_to_px_array(hz, 55, 880, 1000)
+    assert px == pytest.approx([0, 250, 500, 750, 1000])
+    assert Pitch.px_to_hz_array(px, 55, 880, 1000) == pytest.approx(hz)
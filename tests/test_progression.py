@@ -1,9 +1,13 @@
 from collections.abc import Sequence
 
+import numpy as np
 import pytest
 
 from musictool.chord import SpecificChord
 from musictool.progression import Progression
+from musictool.progression import TransposeIndex
+from musictool.progression import transpose_key
+from musictool.progression import transpose_keys
 
 
 @pytest.fixture
@@ -85,3 +89,37 @@ def test_sequence(four_chords):
     assert isinstance(p, Sequence)
     assert p[2] == four_chords[2]
     assert p[1:3] == Progression(four_chords[1:3])
+
+
+def test_transpose_key(four_chords):
+    a, b, c, d = four_chords
+    d_ = SpecificChord(frozenset((d.notes_ascending[0] + 12,) + d.notes_ascending[1:]))
+    p0 = Progression((a, b, c, d))
+    p1 = Progression((a, b, c, d_))
+    p3 = Progression(tuple(SpecificChord(frozenset(n + 1 for n in chord.notes)) for chord in p0))
+    assert p0.transpose_key() != p1.transpose_key()
+    assert p0.transpose_key() == p3.transpose_key()
+    assert p0.transpose_key() == transpose_key([[n.i for n in chord] for chord in p0])
+
+
+def test_transpose_key_lengths():
+    p0 = Progression((SpecificChord.from_str('C1_E1'), SpecificChord.from_str('C1_E1_G1')))
+    p1 = Progression((SpecificChord.from_str('C1_E1_C2'), SpecificChord.from_str('E1_G1')))
+    assert p0.transpose_key() != p1.transpose_key()
+
+
+def test_transpose_keys(progression4):
+    codes = np.array([[[n.i for n in chord] for chord in p] for p in (progression4, progression4 + 5, progression4 + -3)])
+    assert transpose_keys(codes) == [progression4.transpose_key()] * 3
+
+
+def test_transpose_index(progression4):
+    index = TransposeIndex()
+    progressions = [progression4, progression4 + 1, progression4[:3], progression4 + 12, progression4[:3] + 2]
+    assert list(index.unique(progressions)) == [progression4, progression4[:3]]
+    assert len(index) == 2
+    assert progression4 + 7 in index
+    assert index.counts[progression4.transpose_key()] == 3
+    codes = np.array([[[n.i for n in chord] for chord in progression4 + 2], [[n.i + 1 for n in chord] for chord in progression4[::-1]]])
+    assert index.add_array(codes).tolist() == [False, True]
+    assert not index.add_codes([[n.i for n in chord] for chord in progression4])
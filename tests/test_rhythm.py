@@ -1,8 +1,15 @@
+import itertools
+import math
 from collections import deque
 
+import numpy as np
 import pytest
 
 from musictool.rhythm import Rhythm
+from musictool.rhythm import RhythmCatalogue
+from musictool.rhythm import masks_score
+from musictool.rhythm import masks_to_notes
+from musictool.rhythm import rhythm_masks
 
 
 @pytest.fixture
@@ -38,6 +45,12 @@ def test_score(notes, score):
     assert Rhythm(notes, bar_notes=16).score == score
 
 
+def test_score_type():
+    rhythms = Rhythm.all_rhythms(n_notes=4, bar_notes=12, loop=True)
+    assert all(type(r.score) is float for r in rhythms)  # prefilled from masks_score
+    assert all(type(vars(Rhythm)['score'].func(r)) is float for r in rhythms)  # computed by property
+
+
 def test_rhythm_score(example_notes):
     more_notes = 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
     assert Rhythm(example_notes).score < Rhythm(more_notes).score
@@ -67,3 +80,85 @@ def test_all_rhythms():
         Rhythm((1, 0, 1, 0, 0, 1), bar_notes=6),
         Rhythm((1, 0, 1, 0, 1, 0), bar_notes=6),
     )
+
+
+def no_contiguous_ones(notes, loop=False):
+    return not any(a == b == 1 for a, b in zip(notes, notes[1:] + (notes[:1] if loop else ())))
+
+
+@pytest.mark.parametrize('bar_notes', (1, 2, 7, 10))
+@pytest.mark.parametrize('loop', (False, True))
+def test_rhythm_masks(bar_notes, loop):
+    expected = [notes for notes in itertools.product((0, 1), repeat=bar_notes) if no_contiguous_ones(notes, loop)]
+    masks = rhythm_masks(bar_notes, loop=loop)
+    assert [tuple(notes) for notes in masks_to_notes(masks, bar_notes).tolist()] == expected
+    for n_notes in range(bar_notes + 1):
+        masks = rhythm_masks(bar_notes, n_notes, loop=loop)
+        assert [tuple(notes) for notes in masks_to_notes(masks, bar_notes).tolist()] == [notes for notes in expected if sum(notes) == n_notes]
+
+
+@pytest.mark.parametrize('bar_notes, n_notes', ((32, 5), (64, 3)))
+def test_rhythm_masks_large(bar_notes, n_notes):
+    masks = rhythm_masks(bar_notes, n_notes)
+    assert len(masks) == math.comb(bar_notes - n_notes + 1, n_notes)
+    assert np.all(masks & (masks << np.uint64(1)) == 0)
+    assert np.all(masks[1:] > masks[:-1])
+
+
+def test_rhythm_masks_validation():
+    with pytest.raises(ValueError):
+        rhythm_masks(65)
+    with pytest.raises(ValueError):
+        rhythm_masks(16, n_notes=-1)
+
+
+def test_masks_score():
+    masks = rhythm_masks(12)
+    scores = masks_score(masks, 12)
+    for notes, score in zip(masks_to_notes(masks, 12).tolist(), scores.tolist()):
+        if sum(notes):
+            assert Rhythm(tuple(notes), bar_notes=12).score == score
+
+
+def test_all_rhythms_sorted():
+    rhythms = Rhythm.all_rhythms(n_notes=4, bar_notes=12, sort_by_score=True, loop=True)
+    assert [(r.score, r.notes) for r in rhythms] == sorted((r.score, r.notes) for r in rhythms)
+    assert not any(r.has_contiguous_ones for r in rhythms)
+    assert all(r.mask == int(r.bits, base=2) for r in rhythms)
+
+
+@pytest.mark.parametrize('bar_notes, n_notes', ((12, 4), (16, 5), (10, 1)))
+def test_rhythm_catalogue(bar_notes, n_notes, tmp_path):
+    catalogue = RhythmCatalogue.build(bar_notes, n_notes)
+    rhythms = Rhythm.all_rhythms(n_notes, bar_notes, loop=True)
+    necklaces: dict[tuple[int, ...], set[tuple[int, ...]]] = {}
+    for rhythm in rhythms:
+        rotations = [rhythm.notes[i:] + rhythm.notes[:i] for i in range(bar_notes)]
+        necklaces.setdefault(min(rotations), set()).add(rhythm.notes)
+    assert len(catalogue) == len(necklaces)
+    assert sum(catalogue.n_rotations) == len(rhythms)
+    best = catalogue.rhythms()
+    assert [r.notes for r in best] == [notes for _, notes in sorted((Rhythm(notes, bar_notes=bar_notes).score, notes) for notes in necklaces)]
+    assert catalogue.best(3) == best[:3]
+    for rhythm in rhythms[::7]:
+        necklace = best[catalogue.index(rhythm)].notes
+        assert rhythm.notes in necklaces[necklace]
+
+    loaded = RhythmCatalogue.load_or_build(tmp_path, bar_notes, n_notes)
+    assert RhythmCatalogue.load_or_build(tmp_path, bar_notes, n_notes).masks.tolist() == loaded.masks.tolist() == catalogue.masks.tolist()
+    assert loaded.scores.tolist() == catalogue.scores.tolist()
+
+    renamed = (tmp_path / f'{bar_notes}_{n_notes}').rename(tmp_path / 'renamed')
+    loaded = RhythmCatalogue.load(renamed)
+    assert (loaded.bar_notes, loaded.n_notes) == (bar_notes, n_notes)
+
+
+def test_rhythm_catalogue_score_range():
+    catalogue = RhythmCatalogue.build(16, 5)
+    lo, hi = sorted(catalogue.scores[[3, len(catalogue) // 2]].tolist())
+    rhythms = catalogue.between(lo, hi)
+    assert rhythms
+    assert all(lo <= r.score <= hi for r in rhythms)
+    assert len(rhythms) == sum(lo <= s <= hi for s in catalogue.scores.tolist())
+    with pytest.raises(KeyError):
+        catalogue.index(Rhythm((1, 0) * 8))
@@ -1,4 +1,6 @@
+import itertools
 import operator
+from unittest import mock
 
 import pytest
 
@@ -7,6 +9,14 @@ from musictool.chord import Chord
 from musictool.note import Note
 from musictool.scale import ComparedScales
 from musictool.scale import Scale
+from musictool.scale import _scales_of_kind
+from musictool.scale import all_scales
+from musictool.scale import load_snapshot
+from musictool.scale import majors
+from musictool.scale import neighbor_tables
+from musictool.scale import neighbors
+from musictool.scale import save_snapshot
+from musictool.util.cache import UnboundedCache
 
 
 @pytest.mark.parametrize(
@@ -109,3 +119,81 @@ def test_parallel(scale, parallel_name, expected):
 )
 def test_relative(scale, relative_name, expected):
     assert scale.relative(relative_name) is expected
+
+
+def test_all_scales_lazy():
+    scales = _scales_of_kind('pentatonic')
+    assert len(scales) == 12 * len(config.pentatonic)
+    assert scales.n_computed == 0
+    assert ('C', 'p_major') in scales
+    assert ('C', 'major') not in scales
+    assert scales.n_computed == 0
+    assert scales['C', 'p_major'] is Scale.from_name('C', 'p_major')
+    assert scales.n_computed == 1
+    with pytest.raises(KeyError):
+        scales['C', 'major']
+    assert list(scales) == list(itertools.product(config.chromatic_notes, config.pentatonic))
+
+
+def test_majors():
+    assert majors['diatonic'][:3] == (Scale.from_name('C', 'major'), Scale.from_name('G', 'major'), Scale.from_name('D', 'major'))
+    assert all(len(v) == 12 for v in majors.values())
+    assert majors['harmonic'][0] is Scale.from_name('C', 'h_major')
+
+
+def test_snapshot(tmp_path):
+    path = tmp_path / 'scales.pkl'
+    save_snapshot(path)
+    all_scales_ = {kind: _scales_of_kind(kind) for kind in all_scales}
+    with mock.patch.dict('musictool.scale.all_scales', all_scales_):
+        load_snapshot(path)
+    scales = all_scales_['diatonic']
+    assert scales.n_computed == len(scales)
+    assert scales['C', 'major'] is Scale.from_name('C', 'major')
+    assert scales['A', 'minor'].triads == Scale.from_name('A', 'minor').triads
+
+
+def test_snapshot_not_rebuilt(tmp_path):
+    path = tmp_path / 'scales.pkl'
+    save_snapshot(path)
+    all_scales_ = {kind: _scales_of_kind(kind) for kind in all_scales}
+    not_called = mock.Mock(side_effect=AssertionError('__init__ should not be called'))
+    with (
+        mock.patch.dict('musictool.scale.all_scales', all_scales_),
+        mock.patch.object(Scale, '_cache', UnboundedCache()),
+        mock.patch.object(Scale, '__init__', not_called),
+        mock.patch.object(Chord, '__init__', not_called),
+    ):
+        load_snapshot(path)
+        assert Scale.cache_info().misses == 0
+        assert Scale.cache_info().currsize == sum(map(len, all_scales_.values()))
+    assert not_called.call_count == 0
+
+
+@pytest.mark.parametrize('kind', ('diatonic', 'pentatonic', 'sudu'))
+def test_neighbor_table(kind):
+    table = neighbor_tables[kind]
+    assert len(table) == len(all_scales[kind])
+    for left in table.scales[:12]:
+        for right, n_shared in zip(table.scales, table.counts(left), strict=True):
+            assert n_shared == len(left.notes & right.notes)
+        for k in range(len(left) + 1):
+            assert set(table.sharing(left, k)) == {right for right in table.scales if len(left.notes & right.notes) >= k}
+
+
+def test_neighbors():
+    left = Scale.from_name('C', 'major')
+    neighs = neighbors(left)
+    assert sum(map(len, neighs.values())) == len(all_scales['diatonic'])
+    assert {c.right for c in neighs[7]} == {scale for scale in all_scales['diatonic'].values() if scale.notes == left.notes}
+    for n_shared, compared in neighs.items():
+        for c in compared:
+            assert len(c.shared_notes) == n_shared
+            assert c.shared_notes | c.new_notes == c.right.notes
+
+
+def test_compared_lazy_triads():
+    with pytest.raises(AttributeError):
+        ComparedScales(Scale.from_name('C', 'p_major'), Scale.from_name('C', 'p_minor')).shared_triads
+    c = ComparedScales(Scale.from_name('C', 'major'), Scale.from_name('A', 'minor'))
+    assert c.shared_triads == frozenset(c.left.triads)
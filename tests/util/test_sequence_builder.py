@@ -1,8 +1,14 @@
 import itertools
+import multiprocessing
+import os
+import tempfile
 from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 
 import pytest
 
+from musictool.util import sequence_builder
 from musictool.util.sequence_builder import SequenceBuilder
 
 
@@ -127,3 +133,112 @@ def test_parallel():
     a = SequenceBuilder(5, options=options_1, curr_prev_constraint={-1: different_startswith, -2: equal_endswith})
     b = SequenceBuilder(5, options=options_1, curr_prev_constraint={-1: different_startswith, -2: equal_endswith}, parallel=True)
     assert tuple(a) == tuple(b)
+
+
+def first_is_zero(x):
+    return x == 0
+
+
+def test_parallel_skewed():
+    """all results are in subtree of first option, work should be split on deeper prefixes"""
+    options = tuple(range(6))
+    kw = dict(n=5, options=options, i_constraints={0: first_is_zero}, curr_prev_constraint={-1: even_odd_interchange})
+    a = SequenceBuilder(**kw)  # type: ignore
+    b = SequenceBuilder(**kw, parallel=True)  # type: ignore
+    assert tuple(a) == tuple(b)
+    tasks: list[tuple[int, ...]] = b._split((), b._next_ops(()), n_tasks=8)
+    assert len(tasks) >= 8
+    assert all(len(task) < b.n for task in tasks)
+
+
+def test_parallel_executor_reused():
+    executor = sequence_builder.get_executor()
+    tuple(SequenceBuilder(3, options=(0, 1, 2), parallel=True))
+    tuple(SequenceBuilder(4, options=(0, 1, 2), parallel=True))
+    assert sequence_builder.get_executor() is executor
+
+
+def exit_in_worker(x):
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return True
+
+
+def test_parallel_broken_pool():
+    with pytest.raises(BrokenProcessPool):
+        tuple(SequenceBuilder(3, options=(0, 1, 2), i_constraints={2: exit_in_worker}, parallel=True))
+    assert tuple(SequenceBuilder(3, options=(0, 1, 2), parallel=True)) == tuple(SequenceBuilder(3, options=(0, 1, 2)))
+    assert not list(Path(tempfile.gettempdir()).glob('sequence_builder_*.pkl'))
+
+
+@pytest.mark.parametrize('n', (1, 2))
+def test_parallel_short(n):
+    assert tuple(SequenceBuilder(n, options=(0, 1, 2), parallel=True)) == tuple(SequenceBuilder(n, options=(0, 1, 2)))
+
+
+def test_lazy():
+    n_checks = 0
+
+    def counting_constraint(candidate):
+        nonlocal n_checks
+        n_checks += 1
+        return True
+
+    sb = SequenceBuilder(12, options=range(10), candidate_constraint=counting_constraint)
+    first: list[tuple[int, ...]] = list(itertools.islice(sb, 3))
+    assert first == [(0,) * 11 + (0,), (0,) * 11 + (1,), (0,) * 11 + (2,)]
+    assert n_checks < 100
+
+
+def sum_less_than_7(prev, curr):
+    return prev + curr < 7
+
+
+@pytest.mark.parametrize(
+    'kw', (
+        dict(n=5, options=(0, 1, 2, 3, 4, 5), curr_prev_constraint={-1: even_odd_interchange}),
+        dict(n=5, options=(0, 1, 2, 3, 4, 5), curr_prev_constraint={-1: even_odd_interchange, -3: sum_less_than_7}, loop=True),
+        dict(n=4, options=('A0', 'A1', 'C0', 'D0', 'D1'), curr_prev_constraint={-1: different_startswith, -2: equal_endswith}, loop=True),
+        dict(n=5, options=(0, 1, 2, 3, 4, 5, 6, 7), curr_prev_constraint={-1: sum_less_than_7}, i_constraints={4: is_even}),
+    ),
+)
+@pytest.mark.parametrize('precompute_adjacency', (False, True))
+@pytest.mark.parametrize('memoize_dead_states', (False, True))
+def test_pruning_same_result(kw, precompute_adjacency, memoize_dead_states):
+    expected = tuple(SequenceBuilder(**kw))  # type: ignore
+    sb = SequenceBuilder(**kw, precompute_adjacency=precompute_adjacency, memoize_dead_states=memoize_dead_states)
+    assert tuple(sb) == expected
+
+
+def test_precompute_adjacency_prefix_not_in_options():
+    kw = dict(n=4, options=(0, 1, 2, 3), curr_prev_constraint={-1: even_odd_interchange, -2: sum_less_than_7}, prefix=(5, 4))
+    expected = tuple(SequenceBuilder(**kw))  # type: ignore
+    assert expected
+    assert tuple(SequenceBuilder(**kw, precompute_adjacency=True)) == expected  # type: ignore
+
+
+def test_memoize_dead_states():
+    n_calls = 0
+
+    def never(x):
+        nonlocal n_calls
+        n_calls += 1
+        return False
+
+    def explored(**kw):
+        nonlocal n_calls
+        n_calls = 0
+        assert tuple(SequenceBuilder(6, options=(0, 1, 2), i_constraints={5: never}, curr_prev_constraint={-1: sum_less_than_7}, **kw)) == ()
+        return n_calls
+
+    assert explored() == 3 ** 6
+    assert explored(memoize_dead_states=True) == 3 * 3
+
+
+def test_pruning_validation():
+    with pytest.raises(TypeError):
+        SequenceBuilder(3, options_i=[(0, 1)] * 3, precompute_adjacency=True)
+    with pytest.raises(TypeError):
+        SequenceBuilder(3, options=(0, 1), unique_key=identity, memoize_dead_states=True)
+    with pytest.raises(TypeError):
+        SequenceBuilder(3, options=('A', 'B'), candidate_constraint=candidate_constraint, memoize_dead_states=True)
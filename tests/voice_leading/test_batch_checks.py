@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+
+from musictool.chord import SpecificChord
+from musictool.note import SpecificNote
+from musictool.voice_leading import batch_checks
+from musictool.voice_leading import checks
+
+
+def random_chords(n_chords, n_notes):
+    random.seed(n_chords * n_notes)
+    return tuple(
+        SpecificChord(frozenset(SpecificNote.from_i(i) for i in random.sample(range(48, 72), n_notes)))
+        for _ in range(n_chords)
+    )
+
+
+@pytest.mark.parametrize('n_notes', (1, 2, 3, 4))
+@pytest.mark.parametrize(
+    'batch_f, f, extra_args', (
+        (batch_checks.parallel_interval, checks.parallel_interval, (7,)),
+        (batch_checks.parallel_interval, checks.parallel_interval, (0,)),
+        (batch_checks.hidden_parallel, checks.hidden_parallel, (7,)),
+        (batch_checks.hidden_parallel, checks.hidden_parallel, (0,)),
+        (batch_checks.voice_crossing, checks.voice_crossing, ()),
+        (batch_checks.large_leaps, checks.large_leaps, (5,)),
+    ),
+)
+def test_transition_checks(batch_f, f, extra_args, n_notes):
+    a = random_chords(30, n_notes)
+    b = random_chords(20, n_notes)
+    f = f.__wrapped__  # bypass chord_pair_check_cache
+    expected = np.array([[f(x, y, *extra_args) for y in b] for x in a])
+    out = batch_f(batch_checks.chords_to_array(a), batch_checks.chords_to_array(b), *extra_args)
+    assert out.shape == (30, 20)
+    assert np.array_equal(out, expected)
+
+
+@pytest.mark.parametrize(
+    'batch_f, f, extra_args', (
+        (batch_checks.large_spacing, checks.large_spacing, (12,)),
+        (batch_checks.large_spacing, checks.large_spacing, (5,)),
+        (batch_checks.small_spacing, checks.small_spacing, (3,)),
+    ),
+)
+def test_spacing_checks(batch_f, f, extra_args):
+    c = random_chords(50, 4)
+    expected = np.array([f(x, *extra_args) for x in c])
+    assert np.array_equal(batch_f(batch_checks.chords_to_array(c), *extra_args), expected)
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        batch_checks.chords_to_array([SpecificChord.from_str('C1_E1_G1'), SpecificChord.from_str('C1_E1')])
+    with pytest.raises(ValueError):
+        batch_checks.large_leaps(np.zeros((2, 3), dtype=int), np.zeros((2, 4), dtype=int), 5)
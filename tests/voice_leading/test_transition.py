@@ -1,6 +1,7 @@
 import itertools
 import textwrap
 
+import numpy as np
 import pytest
 
 from musictool.chord import SpecificChord
@@ -94,3 +95,56 @@ def test_transition_graph_same_length():
 )
 def test_abstract_graph(graph, expected):
     assert transition.abstract_graph(graph) == expected
+
+
+@pytest.fixture
+def c_major_noterange():
+    return NoteRange(SpecificNote('A', 0), SpecificNote('D', 2), Scale.from_name('C', 'major'))
+
+
+@pytest.mark.parametrize('same_length', (True, False))
+def test_csr_graph(c_major_noterange, same_length):
+    start = SpecificChord.from_str('C1_E1_G1')
+    expected = transition.transition_graph(start, c_major_noterange, same_length=same_length)
+    graph = transition.TransitionGraph.build(start, c_major_noterange, same_length=same_length)
+    assert len(graph) == len(expected)
+    assert graph.n_edges == sum(map(len, expected.values()))
+    assert graph.chord(0) == start
+    assert graph.to_dict() == expected
+    assert graph.neighbors(start) == expected[start]
+
+
+def test_csr_graph_save_load(c_major_noterange, tmp_path):
+    start = SpecificChord.from_str('C1_E1_G1')
+    graph = transition.TransitionGraph.build(start, c_major_noterange)
+    graph.save(tmp_path / 'graph')
+    loaded = transition.TransitionGraph.load(tmp_path / 'graph')
+    assert isinstance(loaded.indices, np.memmap)
+    assert loaded.to_dict() == graph.to_dict()
+    assert loaded.chord_id(start) == 0
+
+
+def test_csr_graph_load_or_build(c_major_noterange, tmp_path):
+    start = SpecificChord.from_str('C1_E1_G1')
+    a = transition.TransitionGraph.load_or_build(tmp_path, start, c_major_noterange)
+    assert len(list(tmp_path.iterdir())) == 1
+    b = transition.TransitionGraph.load_or_build(tmp_path, start, c_major_noterange)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert a.to_dict() == b.to_dict()
+    transition.TransitionGraph.load_or_build(tmp_path, start, c_major_noterange, same_length=False)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_csr_graph_rooted_start_chord(c_major_noterange, tmp_path):
+    start = SpecificChord.from_str('C1_E1_G1/C')
+    graphs = (
+        transition.TransitionGraph.build(start, c_major_noterange),
+        transition.TransitionGraph.load_or_build(tmp_path, start, c_major_noterange),  # cache miss
+        transition.TransitionGraph.load_or_build(tmp_path, start, c_major_noterange),  # cache hit
+    )
+    expected = transition.transition_graph(start, c_major_noterange)
+    for graph in graphs:
+        assert graph.chord(0) == start
+        assert graph.chord_id(start) == 0
+        assert graph.neighbors(start) == expected[start]
+        assert graph.to_dict() == expected